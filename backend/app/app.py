@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
 from .auth import AuthService
 from .database import Database
@@ -16,6 +19,37 @@ from .models import (
     TruckReservation,
     User,
     UserRole,
+    reservation_label,
+)
+
+MAX_RESERVATION_NOTE_LEN = 80
+
+_GET_TRUCK_ID = attrgetter("truck_id")
+_MISSING = object()
+# Active assignment per truck id, shared by every call made inside one request_scope().
+_ACTIVE_ASSIGNMENT_CACHE: ContextVar[Optional[Dict[int, Optional[TruckAssignment]]]] = ContextVar(
+    "active_assignment_cache", default=None
+)
+
+DEFAULT_RANGER_QUESTIONS: tuple[tuple[str, str], ...] = (
+    ("What park was your first assignment?", "Rocky Ridge"),
+    ("What is your ranger call sign?", "Alpha-1"),
+    ("Favorite trail snack?", "Trail mix"),
+)
+DEFAULT_SUPERVISOR_QUESTIONS: tuple[tuple[str, str], ...] = (
+    ("What year did you join the parks team?", "2012"),
+    ("Name of your first ranger partner?", "Jamie"),
+    ("Favorite lookout point?", "Eagle Rock"),
+)
+DEFAULT_TRUCK_DEFINITIONS: tuple[tuple[str, Optional[str]], ...] = (
+    ("SM88", None),
+    ("P0106", None),
+    ("P0101", None),
+    ("P0103", None),
+    ("427", None),
+    ("T1", None),
+    ("T2", None),
+    ("T3", None),
 )
 
 
@@ -34,72 +68,74 @@ class TruckInspectionApp:
         return cls(database=database, auth=auth, inspections=inspections)
 
     def seed_defaults(self) -> None:
-        default_ranger_questions = [
-            ("What park was your first assignment?", "Rocky Ridge"),
-            ("What is your ranger call sign?", "Alpha-1"),
-            ("Favorite trail snack?", "Trail mix"),
-        ]
-        ranger_user = self.database.get_user_by_email("ranger@email.com")
+        existing_users = self.database.get_users_by_emails(("ranger@email.com", "supervisor@email.com"))
+        ranger_user = existing_users.get("ranger@email.com")
         if not ranger_user:
             self.auth.register_user(
                 name="Sample Ranger",
                 email="ranger@email.com",
                 password="password",
-                security_responses=default_ranger_questions,
+                security_responses=DEFAULT_RANGER_QUESTIONS,
                 role=UserRole.RANGER,
                 ranger_number="RN-1001",
             )
         elif not (ranger_user.security_questions or []):
-            self.auth.set_security_questions("ranger@email.com", default_ranger_questions)
-
-        default_supervisor_questions = [
-            ("What year did you join the parks team?", "2012"),
-            ("Name of your first ranger partner?", "Jamie"),
-            ("Favorite lookout point?", "Eagle Rock"),
-        ]
-        supervisor = self.database.get_user_by_email("supervisor@email.com")
+            self.auth.set_security_questions("ranger@email.com", DEFAULT_RANGER_QUESTIONS)
+
+        supervisor = existing_users.get("supervisor@email.com")
         if not supervisor:
             self.auth.register_user(
                 name="Sample Supervisor",
                 email="supervisor@email.com",
                 password="password",
-                security_responses=default_supervisor_questions,
+                security_responses=DEFAULT_SUPERVISOR_QUESTIONS,
                 role=UserRole.SUPERVISOR,
                 ranger_number="RN-2001",
             )
         elif not (supervisor.security_questions or []):
-            self.auth.set_security_questions("supervisor@email.com", default_supervisor_questions)
-        truck_definitions = [
-            ("SM88", None),
-            ("P0106", None),
-            ("P0101", None),
-            ("P0103", None),
-            ("427", None),
-            ("T1", None),
-            ("T2", None),
-            ("T3", None),
-        ]
-        for identifier, description in truck_definitions:
-            if not self.database.get_truck_by_identifier(identifier):
+            self.auth.set_security_questions("supervisor@email.com", DEFAULT_SUPERVISOR_QUESTIONS)
+        existing_trucks = self.database.get_existing_truck_identifiers(
+            identifier for identifier, _ in DEFAULT_TRUCK_DEFINITIONS
+        )
+        for identifier, description in DEFAULT_TRUCK_DEFINITIONS:
+            if identifier not in existing_trucks:
                 self.database.add_truck(identifier, description)
 
     # Truck operations
-    def list_trucks(self) -> List[Truck]:
-        return list(self.database.list_active_trucks())
+    def list_trucks(self) -> Sequence[Truck]:
+        return self.database.list_active_trucks()
 
     def list_available_trucks(self) -> List[Truck]:
-        active_assignments = {assignment.truck_id for assignment in self.database.list_active_assignments()}
-        trucks = list(self.database.list_active_trucks())
-        return [truck for truck in trucks if truck.id not in active_assignments]
+        checked_out = frozenset(map(_GET_TRUCK_ID, self.database.list_active_assignments()))
+        is_checked_out = checked_out.__contains__
+        return [truck for truck in self.database.list_active_trucks() if not is_checked_out(truck.id)]
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """Reuse active-assignment lookups for the duration of a single request."""
+        reset_token = _ACTIVE_ASSIGNMENT_CACHE.set({})
+        try:
+            yield
+        finally:
+            _ACTIVE_ASSIGNMENT_CACHE.reset(reset_token)
 
     def get_active_assignment_for_truck(self, truck: Truck) -> Optional[TruckAssignment]:
-        return self.database.get_active_assignment_for_truck(truck.id)
+        return self._active_assignment_for_truck(truck.id)
+
+    def _active_assignment_for_truck(self, truck_id: int) -> Optional[TruckAssignment]:
+        cache = _ACTIVE_ASSIGNMENT_CACHE.get()
+        if cache is None:
+            return self.database.get_active_assignment_for_truck(truck_id)
+        cached = cache.get(truck_id, _MISSING)
+        if cached is _MISSING:
+            cached = cache[truck_id] = self.database.get_active_assignment_for_truck(truck_id)
+        return cached
 
     def get_active_assignment_for_ranger(self, ranger: User) -> Optional[TruckAssignment]:
         return self.database.get_active_assignment_for_ranger(ranger.id)
 
-    def list_active_assignments(self) -> List[TruckAssignment]:
-        return list(self.database.list_active_assignments())
+    def list_active_assignments(self) -> Sequence[TruckAssignment]:
+        return self.database.list_active_assignments()
 
     def create_truck(self, *, identifier: str, description: Optional[str], supervisor: User) -> Truck:
         if supervisor.role != UserRole.SUPERVISOR:
@@ -185,7 +221,7 @@ class TruckInspectionApp:
         truck: Truck,
         inspection: Inspection,
     ) -> TruckAssignment:
-        if self.database.get_active_assignment_for_truck(truck.id):
+        if self._active_assignment_for_truck(truck.id):
             raise ValueError("Truck is already checked out")
         start_miles = self._extract_odometer(inspection)
         assignment = self.database.add_assignment(
@@ -195,6 +231,7 @@ class TruckInspectionApp:
             start_miles=start_miles,
         )
         self.database.delete_reservation_for_truck(truck.id)
+        _remember_active_assignment(truck.id, assignment)
         return assignment
 
     def return_truck(
@@ -216,11 +253,13 @@ class TruckInspectionApp:
         end_miles = self._extract_odometer(inspection)
         if end_miles < assignment.start_miles:
             raise ValueError("Ending mileage cannot be less than the starting mileage")
-        return self.database.close_assignment(
+        closed = self.database.close_assignment(
             assignment_id,
             end_inspection_id=inspection.id,
             end_miles=end_miles,
         )
+        _remember_active_assignment(closed.truck_id, None)
+        return closed
 
     # Reservation operations
     def reserve_truck(
@@ -230,20 +269,16 @@ class TruckInspectionApp:
         truck: Truck,
         note: Optional[str],
     ) -> TruckReservation:
-        if self.database.get_active_assignment_for_truck(truck.id):
+        if self._active_assignment_for_truck(truck.id):
             raise ValueError("Truck is currently checked out and cannot be reserved.")
         existing = self.database.get_reservation_for_truck(truck.id)
         if existing and existing.user_id != requester.id and requester.role != UserRole.SUPERVISOR:
             raise ValueError("Truck already has a reservation.")
-        clean_note = (note or "").strip()
-        if len(clean_note) > 80:
-            raise ValueError("Reservation note must be 80 characters or fewer.")
-        if not clean_note:
-            clean_note = self._default_reservation_note(requester)
+        clean_note = self._clean_note(note) or requester.reserved_by_label
         return self.database.add_or_update_reservation(
             truck_id=truck.id,
             user_id=requester.id,
-            note=clean_note or None,
+            note=clean_note,
         )
 
     def cancel_reservation(
@@ -259,8 +294,8 @@ class TruckInspectionApp:
             raise PermissionError("You cannot cancel another ranger's reservation.")
         self.database.delete_reservation_for_truck(truck.id)
 
-    def list_truck_reservations(self) -> list[TruckReservation]:
-        return list(self.database.list_reservations())
+    def list_truck_reservations(self) -> Sequence[TruckReservation]:
+        return self.database.list_reservations()
 
     def update_reservation_note(
         self,
@@ -274,27 +309,30 @@ class TruckInspectionApp:
             raise ValueError("No reservation exists for this truck.")
         if reservation.user_id != requester.id:
             raise PermissionError("You cannot update another ranger's reservation.")
-        clean_note = (note or "").strip()
-        if len(clean_note) > 80:
-            raise ValueError("Reservation note must be 80 characters or fewer.")
-        owner = self.database.get_user(reservation.user_id) or requester
+        clean_note = self._clean_note(note)
         if not clean_note:
-            clean_note = self._default_reservation_note(owner)
+            # Only the owner may get here, so the requester's ranger number is the owner's.
+            clean_note = reservation_label(requester.ranger_number)
         return self.database.add_or_update_reservation(
             truck_id=truck.id,
             user_id=reservation.user_id,
             note=clean_note,
         )
 
-    def _default_reservation_note(self, user: User) -> str:
-        number = (user.ranger_number or "").strip()
-        digits = "".join(ch for ch in number if ch.isdigit())
-        suffix = digits[-2:] if len(digits) >= 2 else digits or "--"
-        return f"Reserved by Ranger {suffix}"
+    @staticmethod
+    def _clean_note(note: Optional[str]) -> str:
+        # str.strip() hands back the same object when there is nothing to trim,
+        # so already-clean input from the web form costs no extra allocation.
+        clean_note = note.strip() if note else ""
+        if len(clean_note) > MAX_RESERVATION_NOTE_LEN:
+            raise ValueError(f"Reservation note must be {MAX_RESERVATION_NOTE_LEN} characters or fewer.")
+        return clean_note
 
     @staticmethod
     def _extract_odometer(inspection: Inspection) -> int:
         miles = inspection.responses.get("odometer_miles")
+        if type(miles) is int:
+            return miles
         if miles is None:
             raise ValueError("Inspection must include mileage")
         try:
@@ -303,6 +341,12 @@ class TruckInspectionApp:
             raise ValueError("Invalid mileage value") from exc
 
 
+def _remember_active_assignment(truck_id: int, assignment: Optional[TruckAssignment]) -> None:
+    cache = _ACTIVE_ASSIGNMENT_CACHE.get()
+    if cache is not None:
+        cache[truck_id] = assignment
+
+
 if __name__ == "__main__":  # pragma: no cover - manual interaction helper
     app = TruckInspectionApp.create(Path("truck_inspections.db"))
     app.seed_defaults()
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import hashlib
+import os
 import secrets
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Sequence
 
-from .database import Database
+from .database import Database, hash_session_token
 from .models import SessionToken, User, UserRole
 
 ALLOWED_EMAIL_ROLES: dict[str, UserRole] = {
@@ -23,11 +30,34 @@ ALLOWED_EMAIL_ROLES: dict[str, UserRole] = {
 
 TOKEN_BYTES = 32
 TOKEN_EXPIRY_MINUTES = 12 * 60
+_EXPIRY_DELTA = timedelta(minutes=TOKEN_EXPIRY_MINUTES)
+PASSWORD_SALT_BYTES = 16
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+TOKEN_CACHE_SIZE = 4096
+# Cached token lookups are re-validated against the database at least this often,
+# which bounds how long a token revoked by another process keeps working here.
+TOKEN_CACHE_TTL_NS = 60 * 1_000_000_000
+# Expired session rows are swept at most this often, piggybacking on logins.
+TOKEN_PURGE_INTERVAL_NS = 5 * 60 * 1_000_000_000
+
+
+@lru_cache(maxsize=1024)
+def normalize_email(email: str) -> str:
+    """Canonical lower-cased form used for account lookups and the role allowlist."""
+    return email.strip().lower()
 
 
 @dataclass
 class AuthService:
     database: Database
+    _token_cache: "OrderedDict[bytes, tuple[User, int]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _token_cache_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _next_purge_ns: int = field(default=0, init=False, repr=False)
 
     def register_user(
         self,
@@ -35,17 +65,17 @@ class AuthService:
         email: str,
         password: str,
         *,
-        security_responses: list[tuple[str, str]],
+        security_responses: Sequence[tuple[str, str]],
         role: Optional[UserRole] = None,
         ranger_number: Optional[str] = None,
     ) -> User:
-        normalized = email.strip().lower()
+        normalized = normalize_email(email)
         expected_role = ALLOWED_EMAIL_ROLES.get(normalized)
-        if role is None:
-            role = expected_role or UserRole.RANGER
+        role = role or expected_role or UserRole.RANGER
         if expected_role and role != expected_role:
             raise ValueError("Role does not match approved account permissions.")
-        if not ranger_number or not ranger_number.strip():
+        ranger_number = (ranger_number or "").strip()
+        if not ranger_number:
             raise ValueError("Ranger number is required.")
         password_hash = self._hash_password(password)
         prepared_questions = self._prepare_security_questions(security_responses)
@@ -54,33 +84,85 @@ class AuthService:
             normalized,
             password_hash,
             role,
-            ranger_number.strip(),
+            ranger_number,
             prepared_questions,
         )
 
     def authenticate(self, email: str, password: str) -> Optional[SessionToken]:
-        normalized = email.strip().lower()
+        normalized = normalize_email(email)
         user = self.database.get_user_by_email(normalized)
         if not user:
             return None
         if not self._verify_password(password, user.password_hash):
             return None
         token = secrets.token_urlsafe(TOKEN_BYTES)
-        expires_at = datetime.utcnow() + timedelta(minutes=TOKEN_EXPIRY_MINUTES)
-        return self.database.add_session_token(user.id, token, expires_at)
+        expires_at = datetime.utcnow() + _EXPIRY_DELTA
+        session = self.database.add_session_token(user.id, token, expires_at)
+        self._remember_token(token, user, session.expires_at_ns)
+        self._purge_expired_tokens_if_due()
+        return session
 
     def get_user_for_token(self, token: str) -> Optional[User]:
         if not token:
             return None
-        session = self.database.get_session_token(token)
-        if not session:
+        user = self._cached_user_for_token(token)
+        if user is not None:
+            return user
+        owner = self.database.get_valid_token_owner(token, time.time_ns())
+        if not owner:
             return None
-        if session.expires_at < datetime.utcnow():
+        user_id, expires_at_ns = owner
+        user = self.database.get_user(user_id)
+        if user:
+            self._remember_token(token, user, expires_at_ns)
+        return user
+
+    async def aget_user_for_token(self, token: str) -> Optional[User]:
+        """Async variant for event-loop callers; only cache misses leave the loop for a worker thread."""
+        if not token:
             return None
-        return self.database.get_user(session.user_id)
+        user = self._cached_user_for_token(token)
+        if user is not None:
+            return user
+        return await asyncio.to_thread(self.get_user_for_token, token)
+
+    def _cached_user_for_token(self, token: str) -> Optional[User]:
+        key = hash_session_token(token)
+        with self._token_cache_lock:
+            cached = self._token_cache.get(key)
+            if cached is None:
+                return None
+            user, valid_until_ns = cached
+            if valid_until_ns > time.time_ns():
+                self._token_cache.move_to_end(key)
+                return user
+            del self._token_cache[key]
+        return None
+
+    def invalidate_sessions(self, user_id: int) -> None:
+        with self._token_cache_lock:
+            stale = [key for key, (user, _) in self._token_cache.items() if user.id == user_id]
+            for key in stale:
+                del self._token_cache[key]
+
+    def _purge_expired_tokens_if_due(self) -> None:
+        # Runs inline on the login that crosses the interval: that login waits on the
+        # database write lock for the DELETE and the vacuum, and other writers wait on it.
+        now_ns = time.time_ns()
+        if now_ns < self._next_purge_ns:
+            return
+        self._next_purge_ns = now_ns + TOKEN_PURGE_INTERVAL_NS
+        self.database.purge_expired_tokens()
+
+    def _remember_token(self, token: str, user: User, expires_at_ns: int) -> None:
+        valid_until_ns = min(expires_at_ns, time.time_ns() + TOKEN_CACHE_TTL_NS)
+        with self._token_cache_lock:
+            self._token_cache[hash_session_token(token)] = (user, valid_until_ns)
+            if len(self._token_cache) > TOKEN_CACHE_SIZE:
+                self._token_cache.popitem(last=False)
 
     def update_password(self, email: str, new_password: str, security_answers: list[str]) -> User:
-        normalized = email.strip().lower()
+        normalized = normalize_email(email)
         user = self.database.get_user_by_email(normalized)
         if not user:
             raise LookupError("Account not found.")
@@ -88,19 +170,20 @@ class AuthService:
             raise ValueError("Security questions are not configured for this account.")
         if len(user.security_questions) != len(security_answers):
             raise ValueError("All security questions must be answered.")
-        for entry, answer in zip(user.security_questions, security_answers):
-            if not self._verify_answer(answer, entry.get("answer_hash", "")):
-                raise ValueError("Security answers did not match our records.")
+        if not _verify_answers(user.security_questions, security_answers):
+            raise ValueError("Security answers did not match our records.")
         password_hash = self._hash_password(new_password)
         self.database.update_user_password(user.id, password_hash)
+        self.invalidate_sessions(user.id)
         return self.database.get_user(user.id)
 
-    def set_security_questions(self, email: str, security_responses: list[tuple[str, str]]) -> User:
-        normalized = email.strip().lower()
+    def set_security_questions(self, email: str, security_responses: Sequence[tuple[str, str]]) -> User:
+        normalized = normalize_email(email)
         user = self.database.get_user_by_email(normalized)
         if not user:
             raise LookupError("Account not found.")
         prepared = self._prepare_security_questions(security_responses)
+        self.invalidate_sessions(user.id)
         return self.database.update_user_security_questions(user.id, prepared)
 
     def update_profile(self, user_id: int, *, name: str, ranger_number: Optional[str]) -> User:
@@ -109,22 +192,17 @@ class AuthService:
         number_clean = ranger_number.strip() if ranger_number else None
         if not number_clean:
             raise ValueError("Ranger number is required.")
-        return self.database.update_user_profile(user_id, name.strip(), number_clean)
+        user = self.database.update_user_profile(user_id, name.strip(), number_clean)
+        self.invalidate_sessions(user_id)
+        return user
 
     def _hash_password(self, password: str) -> str:
-        salt = secrets.token_hex(16)
-        digest = hashlib.sha256(f"{salt}:{password}".encode("utf-8")).hexdigest()
-        return f"{salt}${digest}"
+        return _hash_secret(password)
 
     def _verify_password(self, password: str, stored: str) -> bool:
-        try:
-            salt, digest = stored.split("$", 1)
-        except ValueError:
-            return False
-        check = hashlib.sha256(f"{salt}:{password}".encode("utf-8")).hexdigest()
-        return secrets.compare_digest(check, digest)
-
-    def _prepare_security_questions(self, responses: list[tuple[str, str]]) -> list[dict[str, str]]:
+        return _verify_secret(password, stored)
+
+    def _prepare_security_questions(self, responses: Sequence[tuple[str, str]]) -> list[dict[str, str]]:
         cleaned: list[dict[str, str]] = []
         for question, answer in responses:
             q = question.strip()
@@ -137,18 +215,94 @@ class AuthService:
         return cleaned
 
     def _hash_answer(self, answer: str) -> str:
-        normalized = answer.strip().lower()
-        salt = secrets.token_hex(8)
-        digest = hashlib.sha256(f"{salt}:{normalized}".encode("utf-8")).hexdigest()
-        return f"{salt}${digest}"
-
-    def _verify_answer(self, answer: str, stored: str) -> bool:
-        if not stored:
-            return False
-        try:
-            salt, digest = stored.split("$", 1)
-        except ValueError:
-            return False
-        normalized = answer.strip().lower()
-        check = hashlib.sha256(f"{salt}:{normalized}".encode("utf-8")).hexdigest()
-        return secrets.compare_digest(check, digest)
+        return _hash_secret(answer.strip().lower())
+
+
+class _SaltPool:
+    """Hand out salt bytes from one buffered os.urandom read instead of a syscall per salt."""
+
+    _REFILL_BYTES = 8192
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._position = 0
+
+    def take(self, size: int) -> bytes:
+        with self._lock:
+            if self._position + size > len(self._buffer):
+                self._buffer = os.urandom(max(self._REFILL_BYTES, size))
+                self._position = 0
+            start = self._position
+            self._position += size
+            return self._buffer[start : self._position]
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._position = 0
+
+
+_salt_pool = _SaltPool()
+if hasattr(os, "register_at_fork"):
+    # A forked child must never hand out the same buffered bytes as its parent.
+    os.register_at_fork(after_in_child=_salt_pool.reset)
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _hash_secret(secret: str) -> str:
+    """Hash a password or security answer as scrypt$n$r$p$salt_b64$hash_b64."""
+    salt = _salt_pool.take(PASSWORD_SALT_BYTES)
+    digest = hashlib.scrypt(
+        secret.encode("utf-8"), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=SCRYPT_DKLEN
+    )
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def _recompute_digest(secret: str, stored: str) -> Optional[tuple[bytes, bytes]]:
+    """Hash ``secret`` with the scheme and salt recorded in ``stored``; returns (computed, expected)."""
+    parts = stored.split("$")
+    encoded = secret.encode("utf-8")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            expected = base64.b64decode(parts[5])
+            check = hashlib.scrypt(
+                encoded, salt=base64.b64decode(parts[4]), n=n, r=r, p=p, dklen=len(expected)
+            )
+            return check, expected
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            expected = base64.b64decode(parts[3])
+            check = hashlib.pbkdf2_hmac("sha256", encoded, base64.b64decode(parts[2]), int(parts[1]))
+            return check, expected
+    except ValueError:
+        return None
+    if len(parts) == 2:
+        # Legacy "salt$sha256hex" hashes written before a KDF was introduced.
+        salt, digest = parts
+        check = hashlib.sha256(f"{salt}:{secret}".encode("utf-8")).hexdigest()
+        return check.encode("ascii"), digest.encode("utf-8")
+    return None
+
+
+def _verify_secret(secret: str, stored: str) -> bool:
+    recomputed = _recompute_digest(secret, stored)
+    return recomputed is not None and secrets.compare_digest(*recomputed)
+
+
+def _verify_answers(entries: Sequence[dict[str, str]], answers: Sequence[str]) -> bool:
+    """Check every answer, then compare all digests at once so timing does not reveal which one failed."""
+    computed: list[bytes] = []
+    expected: list[bytes] = []
+    well_formed = True
+    for entry, answer in zip(entries, answers):
+        recomputed = _recompute_digest(answer.strip().lower(), entry.get("answer_hash", ""))
+        if recomputed is None or len(recomputed[0]) != len(recomputed[1]):
+            well_formed = False
+            continue
+        computed.append(recomputed[0])
+        expected.append(recomputed[1])
+    return secrets.compare_digest(b"".join(computed), b"".join(expected)) and well_formed
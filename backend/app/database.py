@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import sqlite3
-from contextlib import contextmanager
-from datetime import datetime
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Generator, Iterable, Optional
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, Optional, Tuple, TypeVar
 
 from .models import (
     Inspection,
@@ -20,6 +24,52 @@ from .models import (
 )
 
 ISO_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+# Upper bound on how stale a cached listing may be when another process writes
+# to the same database file; local writes invalidate immediately.
+READ_CACHE_TTL_SECONDS = 5.0
+# Prepared statements kept per pooled connection; covers every distinct query in this module.
+STATEMENT_CACHE_SIZE = 256
+
+# Applied once to every pooled connection.
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA mmap_size = 268435456;
+PRAGMA cache_size = -65536;
+PRAGMA foreign_keys = ON;
+"""
+
+# Tokens are stored only as a BLAKE2b digest; expires_at is integer epoch nanoseconds.
+_SESSION_TOKENS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_tokens (
+    token_hash BLOB PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    created_at TEXT NOT NULL,
+    expires_at INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_session_tokens_expires ON session_tokens(expires_at);
+"""
+
+T = TypeVar("T")
+
+# Shared compact codecs for the JSON columns; skips json.dumps/json.loads argument handling per row.
+_json_encode = json.JSONEncoder(separators=(",", ":")).encode
+_json_decode = json.JSONDecoder().decode
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Direct value -> member maps; calling the Enum class per row goes through EnumMeta.__call__.
+_USER_ROLES: Dict[str, UserRole] = {role.value: role for role in UserRole}
+_INSPECTION_TYPES: Dict[str, InspectionType] = {kind.value: kind for kind in InspectionType}
+
+# list_inspections SQL keyed by (filter by truck, filter by ranger).
+_LIST_INSPECTIONS_SQL: Dict[Tuple[bool, bool], str] = {
+    (False, False): "SELECT * FROM inspections ORDER BY created_at DESC",
+    (True, False): "SELECT * FROM inspections WHERE truck_id = ? ORDER BY created_at DESC",
+    (False, True): "SELECT * FROM inspections WHERE ranger_id = ? ORDER BY created_at DESC",
+    (True, True): "SELECT * FROM inspections WHERE truck_id = ? AND ranger_id = ? ORDER BY created_at DESC",
+}
 
 
 class Database:
@@ -28,12 +78,28 @@ class Database:
     def __init__(self, path: Path) -> None:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # Writers in this process queue here instead of contending for SQLite's
+        # write lock and spinning in its busy handler.
+        self._write_lock = threading.Lock()
+        self._generation = 0
+        self._read_cache: Dict[str, Tuple[int, float, tuple]] = {}
+        # Known emails and truck identifiers let lookups for missing keys skip SQLite.
+        # Misses re-read the keys at most once per READ_CACHE_TTL_SECONDS so rows
+        # inserted by another process become visible.
+        self._known_emails: set[str] = set()
+        self._known_identifiers: set[str] = set()
+        self._known_loaded_at = float("-inf")
 
     def initialize(self) -> None:
         with self._connect() as conn:
+            # Set once rather than per connection, since it takes the write lock. The
+            # pooled connection has already written a WAL header, so the mode only
+            # sticks after a VACUUM, which is instant while the file has no tables.
+            if not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+                conn.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
             conn.executescript(
                 """
-                PRAGMA foreign_keys = ON;
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT NOT NULL,
@@ -69,13 +135,6 @@ class Database:
                     content TEXT NOT NULL,
                     created_at TEXT NOT NULL
                 );
-                CREATE TABLE IF NOT EXISTS session_tokens (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                    token TEXT NOT NULL UNIQUE,
-                    created_at TEXT NOT NULL,
-                    expires_at TEXT NOT NULL
-                );
                 CREATE TABLE IF NOT EXISTS truck_assignments (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     truck_id INTEGER NOT NULL REFERENCES trucks(id),
@@ -109,22 +168,110 @@ class Database:
                 conn.execute(
                     "UPDATE users SET ranger_number = COALESCE(ranger_number, phone)"
                 )
+            token_columns = {row["name"] for row in conn.execute("PRAGMA table_info(session_tokens)")}
+            if "token" in token_columns:
+                # Plaintext-token layout from older releases; existing sessions are dropped.
+                conn.execute("DROP TABLE session_tokens")
+            conn.executescript(_SESSION_TOKENS_SCHEMA)
+        self._load_known_keys()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and tuning it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(_CONNECTION_PRAGMAS)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def backup(self, target: Path) -> None:
+        """Copy the whole database into ``target`` with SQLite's online backup API."""
+        destination = sqlite3.connect(target)
+        try:
+            with self.session() as conn:
+                conn.backup(destination)
+        finally:
+            destination.close()
 
     @contextmanager
     def _connect(self) -> Generator[sqlite3.Connection, None, None]:
-        conn = sqlite3.connect(self.path)
-        conn.row_factory = sqlite3.Row
-        try:
+        yield self._connection()
+
+    @contextmanager
+    def _write(self) -> Generator[sqlite3.Connection, None, None]:
+        conn = self._connection()
+        if conn.in_transaction:
+            # Nested inside an outer write; the outermost block commits.
+            yield conn
+            return
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.commit_invalidates = False
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                # Also covers a failed COMMIT, which would otherwise leave this pooled
+                # connection inside a transaction that later writes silently join.
+                conn.rollback()
+                # Reads inside the transaction may have cached rows that no longer exist.
+                self._invalidate_reads()
+                raise
+            if self._local.commit_invalidates:
+                self._generation += 1
+
+    @contextmanager
+    def transaction(self) -> Generator[sqlite3.Connection, None, None]:
+        """Group several writes into one transaction that commits (or rolls back) at exit."""
+        with self._write() as conn:
             yield conn
-            conn.commit()
-        finally:
-            conn.close()
 
     @contextmanager
     def session(self) -> Generator[sqlite3.Connection, None, None]:
         with self._connect() as conn:
             yield conn
 
+    def _cached(self, key: str, loader: Callable[[], Iterable[T]]) -> Tuple[T, ...]:
+        now = time.monotonic()
+        entry = self._read_cache.get(key)
+        if entry is not None:
+            generation, loaded_at, rows = entry
+            if generation == self._generation and now - loaded_at < READ_CACHE_TTL_SECONDS:
+                return rows
+        # Taken before loading: a write that lands mid-load must leave this entry stale.
+        generation = self._generation
+        rows = tuple(loader())
+        self._read_cache[key] = (generation, now, rows)
+        return rows
+
+    def _invalidate_reads(self) -> None:
+        self._generation += 1
+        if self._connection().in_transaction:
+            # Other threads can still cache pre-commit rows under the new generation,
+            # so the outermost _write bumps it again once COMMIT succeeds.
+            self._local.commit_invalidates = True
+
+    def _load_known_keys(self) -> None:
+        with self.session() as conn:
+            self._known_emails = {row[0] for row in conn.execute("SELECT email FROM users")}
+            self._known_identifiers = {row[0] for row in conn.execute("SELECT identifier FROM trucks")}
+        self._known_loaded_at = time.monotonic()
+
+    def _may_exist(self, known_attr: str, value: str) -> bool:
+        if value in getattr(self, known_attr):
+            return True
+        if time.monotonic() - self._known_loaded_at < READ_CACHE_TTL_SECONDS:
+            return False
+        self._load_known_keys()
+        return value in getattr(self, known_attr)
+
     # User operations
     def add_user(
         self,
@@ -137,8 +284,8 @@ class Database:
     ) -> User:
         now = _utcnow()
         created_at = _format_datetime(now)
-        serialized_questions = json.dumps(security_questions or [])
-        with self.session() as conn:
+        serialized_questions = _json_encode(security_questions or [])
+        with self._write() as conn:
             cursor = conn.execute(
                 """
                 INSERT INTO users (
@@ -148,6 +295,7 @@ class Database:
                 (name, email, password_hash, role.value, created_at, ranger_number, serialized_questions),
             )
             user_id = cursor.lastrowid
+        self._known_emails.add(email)
         return User(
             id=user_id,
             name=name,
@@ -160,38 +308,64 @@ class Database:
         )
 
     def get_user_by_email(self, email: str) -> Optional[User]:
+        if not self._may_exist("_known_emails", email):
+            return None
         with self.session() as conn:
             row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
         return _row_to_user(row) if row else None
 
+    def get_users_by_emails(self, emails: Iterable[str]) -> Dict[str, User]:
+        email_list = list(emails)
+        if not email_list:
+            return {}
+        placeholders = ",".join("?" for _ in email_list)
+        with self.session() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM users WHERE email IN ({placeholders})",
+                email_list,
+            ).fetchall()
+        return {row["email"]: _row_to_user(row) for row in rows}
+
     def get_user(self, user_id: int) -> Optional[User]:
         with self.session() as conn:
             row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
         return _row_to_user(row) if row else None
 
-    def list_users_by_roles(self, roles: Iterable[UserRole]) -> Iterable[User]:
+    def get_users(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        id_list = list(user_ids)
+        if not id_list:
+            return {}
+        placeholders = ",".join("?" for _ in id_list)
+        with self.session() as conn:
+            rows = conn.execute(f"SELECT * FROM users WHERE id IN ({placeholders})", id_list).fetchall()
+        return {row["id"]: _row_to_user(row) for row in rows}
+
+    def list_users_by_roles(self, roles: Iterable[UserRole]) -> Iterator[User]:
         role_list = list(roles)
         if not role_list:
-            return []
+            return
         placeholders = ",".join("?" for _ in role_list)
-        with self.session() as conn:
-            rows = conn.execute(
+        with self.session() as conn, closing(
+            conn.execute(
                 f"SELECT * FROM users WHERE role IN ({placeholders}) ORDER BY name",
                 tuple(role.value for role in role_list),
-            ).fetchall()
-        return [_row_to_user(row) for row in rows]
+            )
+        ) as cursor:
+            yield from map(_row_to_user, cursor)
 
-    def list_rangers(self) -> Iterable[User]:
+    def list_rangers(self) -> Iterator[User]:
         return self.list_users_by_roles([UserRole.RANGER])
 
     # Truck operations
     def add_truck(self, identifier: str, description: Optional[str], active: bool = True) -> Truck:
-        with self.session() as conn:
+        with self._write() as conn:
             cursor = conn.execute(
                 "INSERT INTO trucks (identifier, description, active) VALUES (?, ?, ?)",
                 (identifier, description, 1 if active else 0),
             )
             truck_id = cursor.lastrowid
+            self._invalidate_reads()
+        self._known_identifiers.add(identifier)
         return Truck(id=truck_id, identifier=identifier, description=description, active=active)
 
     def get_truck(self, truck_id: int) -> Optional[Truck]:
@@ -199,16 +373,41 @@ class Database:
             row = conn.execute("SELECT * FROM trucks WHERE id = ?", (truck_id,)).fetchone()
         return _row_to_truck(row) if row else None
 
+    def get_trucks(self, truck_ids: Iterable[int]) -> Dict[int, Truck]:
+        id_list = list(truck_ids)
+        if not id_list:
+            return {}
+        placeholders = ",".join("?" for _ in id_list)
+        with self.session() as conn:
+            rows = conn.execute(f"SELECT * FROM trucks WHERE id IN ({placeholders})", id_list).fetchall()
+        return {row["id"]: _row_to_truck(row) for row in rows}
+
     def get_truck_by_identifier(self, identifier: str) -> Optional[Truck]:
+        if not self._may_exist("_known_identifiers", identifier):
+            return None
         with self.session() as conn:
             row = conn.execute("SELECT * FROM trucks WHERE identifier = ?", (identifier,)).fetchone()
         return _row_to_truck(row) if row else None
 
-    def list_active_trucks(self) -> Iterable[Truck]:
+    def get_existing_truck_identifiers(self, identifiers: Iterable[str]) -> set[str]:
+        identifier_list = list(identifiers)
+        if not identifier_list:
+            return set()
+        placeholders = ",".join("?" for _ in identifier_list)
+        with self.session() as conn:
+            rows = conn.execute(
+                f"SELECT identifier FROM trucks WHERE identifier IN ({placeholders})",
+                identifier_list,
+            ).fetchall()
+        return {row["identifier"] for row in rows}
+
+    def list_active_trucks(self) -> Tuple[Truck, ...]:
+        return self._cached("active_trucks", self._load_active_trucks)
+
+    def _load_active_trucks(self) -> Iterable[Truck]:
         with self.session() as conn:
             rows = conn.execute("SELECT * FROM trucks WHERE active = 1 ORDER BY identifier").fetchall()
-        for row in rows:
-            yield _row_to_truck(row)
+        return map(_row_to_truck, rows)
 
     # Inspection operations
     def add_inspection(
@@ -223,7 +422,8 @@ class Database:
     ) -> Inspection:
         now = _utcnow()
         created_at = _format_datetime(now)
-        with self.session() as conn:
+        photo_list = list(photo_urls)
+        with self._write() as conn:
             cursor = conn.execute(
                 """
                 INSERT INTO inspections (
@@ -236,8 +436,8 @@ class Database:
                     truck_id,
                     ranger_id,
                     1 if escalate_visibility else 0,
-                    json.dumps(responses),
-                    json.dumps(list(photo_urls)),
+                    _json_encode(responses),
+                    _json_encode(photo_list),
                     video_url,
                     created_at,
                     created_at,
@@ -251,14 +451,14 @@ class Database:
             ranger_id=ranger_id,
             escalate_visibility=escalate_visibility,
             responses=responses,
-            photo_urls=list(photo_urls),
+            photo_urls=photo_list,
             video_url=video_url,
             created_at=now,
             updated_at=now,
         )
 
     def update_inspection_timestamp(self, inspection_id: int, updated_at: datetime) -> None:
-        with self.session() as conn:
+        with self._write() as conn:
             conn.execute(
                 "UPDATE inspections SET updated_at = ? WHERE id = ?",
                 (_format_datetime(updated_at), inspection_id),
@@ -274,30 +474,17 @@ class Database:
         *,
         truck_id: Optional[int] = None,
         ranger_id: Optional[int] = None,
-    ) -> Iterable[Inspection]:
-        query = "SELECT * FROM inspections"
-        params: list[Any] = []
-        clauses: list[str] = []
-        if truck_id is not None:
-            clauses.append("truck_id = ?")
-            params.append(truck_id)
-        if ranger_id is not None:
-            clauses.append("ranger_id = ?")
-            params.append(ranger_id)
-        if clauses:
-            query += " WHERE " + " AND ".join(clauses)
-        query += " ORDER BY created_at DESC"
-
-        with self.session() as conn:
-            rows = conn.execute(query, params).fetchall()
-        for row in rows:
-            yield _row_to_inspection(row)
+    ) -> Iterator[Inspection]:
+        key = (truck_id is not None, ranger_id is not None)
+        params = tuple(value for value in (truck_id, ranger_id) if value is not None)
+        with self.session() as conn, closing(conn.execute(_LIST_INSPECTIONS_SQL[key], params)) as cursor:
+            yield from map(_row_to_inspection, cursor)
 
     # Notes operations
     def add_note(self, inspection_id: int, author_id: int, content: str) -> InspectionNote:
         now = _utcnow()
         created_at = _format_datetime(now)
-        with self.session() as conn:
+        with self._write() as conn:
             cursor = conn.execute(
                 "INSERT INTO inspection_notes (inspection_id, author_id, content, created_at) VALUES (?, ?, ?, ?)",
                 (inspection_id, author_id, content, created_at),
@@ -305,40 +492,95 @@ class Database:
             note_id = cursor.lastrowid
         return InspectionNote(id=note_id, inspection_id=inspection_id, author_id=author_id, content=content, created_at=now)
 
-    def list_notes(self, inspection_id: int) -> Iterable[InspectionNote]:
-        with self.session() as conn:
-            rows = conn.execute(
+    def add_notes(self, notes: Iterable[tuple[int, int, str]]) -> int:
+        """Insert (inspection_id, author_id, content) notes in bulk and touch their inspections."""
+        created_at = _format_datetime(_utcnow())
+        rows = [(inspection_id, author_id, content, created_at) for inspection_id, author_id, content in notes]
+        if not rows:
+            return 0
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT INTO inspection_notes (inspection_id, author_id, content, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.executemany(
+                "UPDATE inspections SET updated_at = ? WHERE id = ?",
+                [(created_at, inspection_id) for inspection_id in {row[0] for row in rows}],
+            )
+        return len(rows)
+
+    def list_notes(self, inspection_id: int) -> Iterator[InspectionNote]:
+        with self.session() as conn, closing(
+            conn.execute(
                 "SELECT * FROM inspection_notes WHERE inspection_id = ? ORDER BY created_at ASC",
                 (inspection_id,),
+            )
+        ) as cursor:
+            yield from map(_row_to_note, cursor)
+
+    def count_escalated_inspections(self) -> int:
+        with self.session() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM inspections WHERE escalate_visibility").fetchone()
+        return count
+
+    def count_notes_by_inspection(self) -> Dict[int, int]:
+        with self.session() as conn:
+            rows = conn.execute(
+                "SELECT inspection_id, COUNT(*) FROM inspection_notes GROUP BY inspection_id"
             ).fetchall()
-        for row in rows:
-            yield _row_to_note(row)
+        return dict(rows)
 
     # Session token operations
     def add_session_token(self, user_id: int, token: str, expires_at: datetime) -> SessionToken:
         created_at = _utcnow()
-        with self.session() as conn:
-            cursor = conn.execute(
-                "INSERT INTO session_tokens (user_id, token, created_at, expires_at) VALUES (?, ?, ?, ?)",
-                (
-                    user_id,
-                    token,
-                    _format_datetime(created_at),
-                    _format_datetime(expires_at),
-                ),
+        expires_at_ns = _datetime_to_ns(expires_at)
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO session_tokens (token_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (hash_session_token(token), user_id, _format_datetime(created_at), expires_at_ns),
             )
-            token_id = cursor.lastrowid
-        return SessionToken(id=token_id, user_id=user_id, token=token, created_at=created_at, expires_at=expires_at)
+        return SessionToken(
+            user_id=user_id,
+            token=token,
+            created_at=created_at,
+            expires_at=expires_at,
+            expires_at_ns=expires_at_ns,
+        )
 
     def get_session_token(self, token: str) -> Optional[SessionToken]:
         with self.session() as conn:
-            row = conn.execute("SELECT * FROM session_tokens WHERE token = ?", (token,)).fetchone()
-        return _row_to_session_token(row) if row else None
+            row = conn.execute(
+                "SELECT * FROM session_tokens WHERE token_hash = ?",
+                (hash_session_token(token),),
+            ).fetchone()
+        return _row_to_session_token(row, token) if row else None
 
-    def purge_expired_tokens(self, now: Optional[datetime] = None) -> None:
-        now = now or _utcnow()
+    async def aget_session_token(self, token: str) -> Optional[SessionToken]:
+        # Each worker thread uses its own pooled connection.
+        return await asyncio.to_thread(self.get_session_token, token)
+
+    def get_valid_token_owner(self, token: str, now_ns: int) -> Optional[Tuple[int, int]]:
+        """Return (user_id, expires_at_ns) for an unexpired token without building a SessionToken."""
         with self.session() as conn:
-            conn.execute("DELETE FROM session_tokens WHERE expires_at < ?", (_format_datetime(now),))
+            row = conn.execute(
+                "SELECT user_id, expires_at FROM session_tokens WHERE token_hash = ? AND expires_at >= ?",
+                (hash_session_token(token), now_ns),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def purge_expired_tokens(self, now: Optional[datetime] = None) -> int:
+        now = now or _utcnow()
+        with self._write() as conn:
+            deleted = conn.execute(
+                "DELETE FROM session_tokens WHERE expires_at < ?", (_datetime_to_ns(now),)
+            ).rowcount
+        if deleted:
+            with self._connect() as conn:
+                # execute() steps the pragma once and frees a single page; executescript runs it
+                # to completion. It also commits, so skip it inside an enclosing transaction.
+                if not conn.in_transaction:
+                    conn.executescript("PRAGMA incremental_vacuum;")
+        return deleted
 
     # Assignment operations
     def add_assignment(
@@ -350,7 +592,7 @@ class Database:
         start_miles: int,
     ) -> TruckAssignment:
         now = _utcnow()
-        with self.session() as conn:
+        with self._write() as conn:
             cursor = conn.execute(
                 """
                 INSERT INTO truck_assignments (
@@ -360,6 +602,7 @@ class Database:
                 (truck_id, ranger_id, start_inspection_id, start_miles, _format_datetime(now)),
             )
             assignment_id = cursor.lastrowid
+            self._invalidate_reads()
         assignment = self.get_assignment(assignment_id)
         assert assignment is not None
         return assignment
@@ -372,7 +615,7 @@ class Database:
         end_miles: int,
     ) -> TruckAssignment:
         returned_at = _utcnow()
-        with self.session() as conn:
+        with self._write() as conn:
             conn.execute(
                 """
                 UPDATE truck_assignments
@@ -381,6 +624,7 @@ class Database:
                 """,
                 (end_inspection_id, end_miles, _format_datetime(returned_at), assignment_id),
             )
+            self._invalidate_reads()
         assignment = self.get_assignment(assignment_id)
         assert assignment is not None
         return assignment
@@ -406,19 +650,29 @@ class Database:
             ).fetchone()
         return _row_to_assignment(row) if row else None
 
-    def list_active_assignments(self) -> Iterable[TruckAssignment]:
+    def list_active_assignments(self) -> Tuple[TruckAssignment, ...]:
+        return self._cached("active_assignments", self._load_active_assignments)
+
+    def _load_active_assignments(self) -> Iterable[TruckAssignment]:
         with self.session() as conn:
             rows = conn.execute(
                 "SELECT * FROM truck_assignments WHERE returned_at IS NULL",
             ).fetchall()
-        for row in rows:
-            yield _row_to_assignment(row)
+        return map(_row_to_assignment, rows)
+
+    def list_assignments(self) -> Iterator[TruckAssignment]:
+        with self.session() as conn, closing(conn.execute("SELECT * FROM truck_assignments")) as cursor:
+            yield from map(_row_to_assignment, cursor)
 
-    def list_assignments(self) -> Iterable[TruckAssignment]:
+    def summarize_completed_assignments(self) -> Dict[int, Tuple[int, datetime]]:
+        """Map each ranger id to (returned assignment count, latest return time)."""
+        # Timestamps share one fixed-width ISO format, so MAX over the text is chronological.
         with self.session() as conn:
-            rows = conn.execute("SELECT * FROM truck_assignments").fetchall()
-        for row in rows:
-            yield _row_to_assignment(row)
+            rows = conn.execute(
+                "SELECT ranger_id, COUNT(*), MAX(returned_at) FROM truck_assignments"
+                " WHERE returned_at IS NOT NULL GROUP BY ranger_id"
+            ).fetchall()
+        return {ranger_id: (count, _parse_datetime(latest)) for ranger_id, count, latest in rows}
 
     def add_or_update_reservation(
         self,
@@ -429,7 +683,7 @@ class Database:
     ) -> TruckReservation:
         now = _utcnow()
         reserved_at = _format_datetime(now)
-        with self.session() as conn:
+        with self._write() as conn:
             conn.execute(
                 """
                 INSERT INTO truck_reservations (truck_id, user_id, note, reserved_at)
@@ -441,35 +695,39 @@ class Database:
                 """,
                 (truck_id, user_id, note, reserved_at),
             )
+            self._invalidate_reads()
         reservation = self.get_reservation_for_truck(truck_id)
         assert reservation is not None
         return reservation
 
     def delete_reservation_for_truck(self, truck_id: int) -> None:
-        with self.session() as conn:
+        with self._write() as conn:
             conn.execute("DELETE FROM truck_reservations WHERE truck_id = ?", (truck_id,))
+            self._invalidate_reads()
 
     def get_reservation_for_truck(self, truck_id: int) -> Optional[TruckReservation]:
         with self.session() as conn:
             row = conn.execute("SELECT * FROM truck_reservations WHERE truck_id = ?", (truck_id,)).fetchone()
         return _row_to_reservation(row) if row else None
 
-    def list_reservations(self) -> Iterable[TruckReservation]:
+    def list_reservations(self) -> Tuple[TruckReservation, ...]:
+        return self._cached("reservations", self._load_reservations)
+
+    def _load_reservations(self) -> Iterable[TruckReservation]:
         with self.session() as conn:
             rows = conn.execute("SELECT * FROM truck_reservations").fetchall()
-        for row in rows:
-            yield _row_to_reservation(row)
+        return map(_row_to_reservation, rows)
 
     def update_user_password(self, user_id: int, password_hash: str) -> None:
-        with self.session() as conn:
+        with self._write() as conn:
             conn.execute(
                 "UPDATE users SET password_hash = ? WHERE id = ?",
                 (password_hash, user_id),
             )
 
     def update_user_security_questions(self, user_id: int, security_questions: list[dict[str, str]]) -> User:
-        serialized = json.dumps(security_questions)
-        with self.session() as conn:
+        serialized = _json_encode(security_questions)
+        with self._write() as conn:
             conn.execute(
                 "UPDATE users SET security_questions = ? WHERE id = ?",
                 (serialized, user_id),
@@ -480,7 +738,7 @@ class Database:
         return user
 
     def update_user_profile(self, user_id: int, name: str, ranger_number: Optional[str]) -> User:
-        with self.session() as conn:
+        with self._write() as conn:
             conn.execute(
                 "UPDATE users SET name = ?, ranger_number = ? WHERE id = ?",
                 (name, ranger_number, user_id),
@@ -494,13 +752,13 @@ class Database:
 def _row_to_user(row: sqlite3.Row) -> User:
     ranger_number = row["ranger_number"] if "ranger_number" in row.keys() else None
     questions_raw = row["security_questions"] if "security_questions" in row.keys() else None
-    security_questions = json.loads(questions_raw) if questions_raw else []
+    security_questions = _json_decode(questions_raw) if questions_raw else []
     return User(
         id=row["id"],
         name=row["name"],
         email=row["email"],
         password_hash=row["password_hash"],
-        role=UserRole(row["role"]),
+        role=_USER_ROLES[row["role"]],
         created_at=_parse_datetime(row["created_at"]),
         ranger_number=ranger_number,
         security_questions=security_questions,
@@ -529,12 +787,12 @@ def _row_to_truck(row: sqlite3.Row) -> Truck:
 def _row_to_inspection(row: sqlite3.Row) -> Inspection:
     return Inspection(
         id=row["id"],
-        inspection_type=InspectionType(row["inspection_type"]),
+        inspection_type=_INSPECTION_TYPES[row["inspection_type"]],
         truck_id=row["truck_id"],
         ranger_id=row["ranger_id"],
         escalate_visibility=bool(row["escalate_visibility"]),
-        responses=json.loads(row["responses"]),
-        photo_urls=json.loads(row["photo_urls"]),
+        responses=_json_decode(row["responses"]),
+        photo_urls=_json_decode(row["photo_urls"]),
         video_url=row["video_url"],
         created_at=_parse_datetime(row["created_at"]),
         updated_at=_parse_datetime(row["updated_at"]),
@@ -551,13 +809,14 @@ def _row_to_note(row: sqlite3.Row) -> InspectionNote:
     )
 
 
-def _row_to_session_token(row: sqlite3.Row) -> SessionToken:
+def _row_to_session_token(row: sqlite3.Row, token: str) -> SessionToken:
+    expires_at_ns = row["expires_at"]
     return SessionToken(
-        id=row["id"],
         user_id=row["user_id"],
-        token=row["token"],
+        token=token,
         created_at=_parse_datetime(row["created_at"]),
-        expires_at=_parse_datetime(row["expires_at"]),
+        expires_at=_ns_to_datetime(expires_at_ns),
+        expires_at_ns=expires_at_ns,
     )
 
 
@@ -580,8 +839,31 @@ def _utcnow() -> datetime:
 
 
 def _format_datetime(value: datetime) -> str:
-    return value.strftime(ISO_FORMAT)
+    # Same text as value.strftime(ISO_FORMAT), produced by the C isoformat path.
+    return value.isoformat(timespec="microseconds") + "Z"
 
 
 def _parse_datetime(value: str) -> datetime:
-    return datetime.strptime(value, ISO_FORMAT)
+    # Stored values always end in "Z"; dropping it keeps fromisoformat working on
+    # Python < 3.11 and the result naive UTC like the rest of the codebase.
+    return datetime.fromisoformat(value[:-1])
+
+
+# Cloning a configured context skips re-parsing the digest parameters per token.
+_TOKEN_HASH_PROTO = hashlib.blake2b(digest_size=16)
+
+
+def hash_session_token(token: str) -> bytes:
+    digest = _TOKEN_HASH_PROTO.copy()
+    digest.update(token.encode("utf-8"))
+    return digest.digest()
+
+
+def _datetime_to_ns(value: datetime) -> int:
+    """Convert a naive UTC datetime into integer nanoseconds since the epoch."""
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def _ns_to_datetime(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value // 1_000)
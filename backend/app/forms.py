@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict
+from functools import partial
+from typing import Any, Callable, Dict
 
 from .models import InspectionType
 
@@ -63,40 +64,60 @@ FORM_DEFINITIONS: dict[InspectionType, tuple[InspectionField, ...]] = {
 }
 
 
-def get_form_definition(inspection_type: InspectionType) -> tuple[InspectionField, ...]:
-    return FORM_DEFINITIONS[inspection_type]
+_REQUIRED_FIELDS: dict[InspectionType, tuple[InspectionField, ...]] = {
+    inspection_type: tuple(field for field in fields if field.required)
+    for inspection_type, fields in FORM_DEFINITIONS.items()
+}
 
 
-def validate_responses(inspection_type: InspectionType, responses: Dict[str, Any]) -> Dict[str, Any]:
-    expected = {field.id: field for field in get_form_definition(inspection_type)}
-    cleaned: Dict[str, Any] = {}
+# Bound lookup rather than a wrapper function: callers hit the dict directly.
+get_form_definition: Callable[[InspectionType], tuple[InspectionField, ...]] = FORM_DEFINITIONS.__getitem__
+
 
-    for field_id, field in expected.items():
-        if field.required and field_id not in responses:
+def validate_responses(inspection_type: InspectionType, responses: Dict[str, Any]) -> Dict[str, Any]:
+    for field in _REQUIRED_FIELDS[inspection_type]:
+        if field.id not in responses:
             raise ValueError(f"Missing required response for '{field.label}'")
 
+    plan = _VALIDATION_PLANS[inspection_type]
+    cleaned: Dict[str, Any] = {}
     for key, value in responses.items():
-        field = expected.get(key)
-        if field is None:
+        coerce = plan.get(key)
+        if coerce is None:
             raise ValueError(f"Unexpected response field '{key}'")
-        cleaned[key] = _coerce_value(field, value)
+        cleaned[key] = coerce(value)
 
     return cleaned
 
 
-def _coerce_value(field: InspectionField, value: Any) -> Any:
-    if field.field_type is FieldType.BOOLEAN:
-        if isinstance(value, bool):
-            return value
-        raise ValueError(f"Field '{field.label}' must be a boolean")
-    if field.field_type is FieldType.TEXT:
-        if isinstance(value, str):
-            return value.strip()
-        raise ValueError(f"Field '{field.label}' must be a string")
-    if field.field_type is FieldType.NUMBER:
-        if isinstance(value, (int, float)):
-            return int(value)
-        if isinstance(value, str) and value.strip().isdigit():
-            return int(value.strip())
-        raise ValueError(f"Field '{field.label}' must be a number")
-    raise ValueError(f"Unsupported field type for '{field.label}'")
+def _coerce_boolean(field: InspectionField, value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    raise ValueError(f"Field '{field.label}' must be a boolean")
+
+
+def _coerce_text(field: InspectionField, value: Any) -> str:
+    if isinstance(value, str):
+        return value.strip()
+    raise ValueError(f"Field '{field.label}' must be a string")
+
+
+def _coerce_number(field: InspectionField, value: Any) -> int:
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    raise ValueError(f"Field '{field.label}' must be a number")
+
+
+_COERCERS: Dict[FieldType, Callable[[InspectionField, Any], Any]] = {
+    FieldType.BOOLEAN: _coerce_boolean,
+    FieldType.TEXT: _coerce_text,
+    FieldType.NUMBER: _coerce_number,
+}
+
+# Per inspection type, each field id maps to its coercer with the field already bound.
+_VALIDATION_PLANS: dict[InspectionType, dict[str, Callable[[Any], Any]]] = {
+    inspection_type: {field.id: partial(_COERCERS[field.field_type], field) for field in fields}
+    for inspection_type, fields in FORM_DEFINITIONS.items()
+}
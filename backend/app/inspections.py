@@ -4,21 +4,99 @@ import io
 from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Optional
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.drawing.image import Image
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils import get_column_letter
 
 from .database import Database
-from .forms import FieldType, get_form_definition, validate_responses
+from .forms import FieldType, InspectionField, get_form_definition, validate_responses
 from .models import Inspection, InspectionNote, InspectionType, Truck, User, UserRole
 
 PHOTO_MIN = 4
 PHOTO_MAX = 10
 NOTE_WINDOW_HOURS = 24
+_NOTE_WINDOW = timedelta(hours=NOTE_WINDOW_HOURS)
+EXPORT_BATCH_SIZE = 500
+
+_FORMS: dict[str, list[dict[str, object]]] = {
+    inspection_type.value: [
+        {
+            "id": field.id,
+            "label": field.label,
+            "field_type": field.field_type.value,
+            "required": field.required,
+        }
+        for field in get_form_definition(inspection_type)
+    ]
+    for inspection_type in InspectionType
+}
+
+_TITLE_FONT = Font(size=16, bold=True, color="24512C")
+_HEADER_FONT = Font(bold=True, color="1F2A24")
+_MUTED_FONT = Font(color="5B6657")
+_CENTERED = Alignment(horizontal="center")
+_HIGHLIGHT_FILL = PatternFill(start_color="FFF4E5", end_color="FFF4E5", fill_type="solid")
+
+# Export rendering per form field: booleans flag an attention item when False
+# (the leak check also when True), free-text notes flag one when non-empty.
+_BOOLEAN, _LEAK_CHECK, _NOTE_TEXT, _PLAIN = range(4)
+
+
+def _export_kind(field: InspectionField) -> int:
+    if field.field_type is FieldType.BOOLEAN:
+        return _LEAK_CHECK if field.id == "fluid_leak_detected" else _BOOLEAN
+    if field.field_type is FieldType.TEXT and field.id in {"notes", "return_notes"}:
+        return _NOTE_TEXT
+    return _PLAIN
+
+
+_EXPORT_FIELDS: dict[InspectionType, tuple[tuple[str, str, str, int], ...]] = {
+    inspection_type: tuple(
+        (field.id, field.label, field.field_type.value, _export_kind(field))
+        for field in get_form_definition(inspection_type)
+    )
+    for inspection_type in InspectionType
+}
+
+
+def _styled_cell(
+    worksheet: Any,
+    value: object,
+    *,
+    font: Optional[Font] = None,
+    fill: Optional[PatternFill] = None,
+    alignment: Optional[Alignment] = None,
+) -> WriteOnlyCell:
+    cell = WriteOnlyCell(worksheet, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if alignment is not None:
+        cell.alignment = alignment
+    return cell
+
+
+def _prefetch_related(
+    database: Database,
+    inspections: Iterator[Inspection],
+    trucks: dict[int, Truck],
+    rangers: dict[int, User],
+) -> Iterator[Inspection]:
+    """Stream inspections in batches, bulk-loading unseen trucks and rangers before each batch."""
+    while True:
+        batch = list(islice(inspections, EXPORT_BATCH_SIZE))
+        if not batch:
+            return
+        trucks.update(database.get_trucks({inspection.truck_id for inspection in batch} - trucks.keys()))
+        rangers.update(database.get_users({inspection.ranger_id for inspection in batch} - rangers.keys()))
+        yield from batch
 
 
 @dataclass
@@ -26,18 +104,8 @@ class InspectionService:
     database: Database
 
     def list_forms(self) -> dict[str, list[dict[str, object]]]:
-        return {
-            inspection_type.value: [
-                {
-                    "id": field.id,
-                    "label": field.label,
-                    "field_type": field.field_type.value,
-                    "required": field.required,
-                }
-                for field in get_form_definition(inspection_type)
-            ]
-            for inspection_type in InspectionType
-        }
+        # Shared across callers; the form definitions are static so nobody mutates it.
+        return _FORMS
 
     def create_inspection(
         self,
@@ -54,7 +122,8 @@ class InspectionService:
             raise PermissionError("Only rangers and supervisors may create inspections")
         if not truck.active:
             raise ValueError("Truck is not active")
-        photo_list = list(photo_urls)
+        # One past the limit is enough to reject an oversized submission.
+        photo_list = list(islice(photo_urls, PHOTO_MAX + 1))
         if inspection_type is not InspectionType.RETURN:
             if len(photo_list) < PHOTO_MIN or len(photo_list) > PHOTO_MAX:
                 raise ValueError("Between 4 and 10 photos are required")
@@ -97,7 +166,7 @@ class InspectionService:
     def add_note(self, *, requester: User, inspection: Inspection, content: str) -> InspectionNote:
         if requester.role == UserRole.RANGER and inspection.ranger_id != requester.id:
             raise PermissionError("Cannot annotate another ranger's inspection")
-        if datetime.utcnow() - inspection.created_at > timedelta(hours=NOTE_WINDOW_HOURS):
+        if datetime.utcnow() - inspection.created_at > _NOTE_WINDOW:
             raise ValueError("Notes can only be added within 24 hours of submission")
         note = self.database.add_note(inspection_id=inspection.id, author_id=requester.id, content=content)
         self.database.update_inspection_timestamp(inspection.id, note.created_at)
@@ -112,91 +181,32 @@ class InspectionService:
         generated_by: User,
         photo_resolver: Optional[Callable[[str], Optional[Path]]] = None,
     ) -> tuple[str, bytes]:
-        inspections = list(self.database.list_inspections())
-        trucks = {
-            truck_id: self.database.get_truck(truck_id)
-            for truck_id in {inspection.truck_id for inspection in inspections}
-        }
-        rangers = {
-            ranger_id: self.database.get_user(ranger_id)
-            for ranger_id in {inspection.ranger_id for inspection in inspections}
-        }
-        notes_count: dict[int, int] = {}
-        for inspection in inspections:
-            notes_count[inspection.id] = sum(1 for _ in self.database.list_notes(inspection.id))
-
-        workbook = Workbook()
-        summary_ws = workbook.active
-        summary_ws.title = "Summary"
+        total = 0
+        truck_ids: set[int] = set()
+        ranger_counts: Counter[int] = Counter()
+        type_counts = dict.fromkeys(InspectionType, 0)
+        escalated = 0
+        photo_total = 0
+        last_inspection: Optional[datetime] = None
+        trucks: dict[int, Truck] = {}
+        rangers: dict[int, User] = {}
+        notes_count = self.database.count_notes_by_inspection()
+
+        workbook = Workbook(write_only=True)
+        # Write-only sheets stream rows straight into the archive, so column widths,
+        # merges, filters and frozen panes are configured before the first append.
+        # Sheets may be appended to in any order; tabs follow creation order.
+        summary_ws = workbook.create_sheet("Summary")
+        detail_ws = workbook.create_sheet("Inspections")
+        responses_ws = workbook.create_sheet("Responses")
+        photos_ws = workbook.create_sheet("Photos")
 
         now = datetime.utcnow()
-        title_font = Font(size=16, bold=True, color="24512C")
-        header_font = Font(bold=True, color="1F2A24")
-        muted_font = Font(color="5B6657")
-
-        summary_ws["A1"] = "Inspection program snapshot"
-        summary_ws["A1"].font = title_font
-        summary_ws.merge_cells("A1:E1")
-        summary_ws["A2"] = f"Generated for {generated_by.name}"
-        summary_ws["A2"].font = muted_font
-        summary_ws.merge_cells("A2:E2")
-        summary_ws["A3"] = now.strftime("Created %Y-%m-%d %H:%M UTC")
-        summary_ws["A3"].font = muted_font
-        summary_ws.merge_cells("A3:E3")
-
-        total = len(inspections)
-        escalated = sum(1 for inspection in inspections if inspection.escalate_visibility)
-        last_inspection = max((inspection.created_at for inspection in inspections), default=None)
-        unique_trucks = len({inspection.truck_id for inspection in inspections})
-        unique_rangers = len({inspection.ranger_id for inspection in inspections})
-        average_photos = (
-            round(sum(len(inspection.photo_urls) for inspection in inspections) / total, 1)
-            if total
-            else 0.0
-        )
-
-        summary_ws["A5"], summary_ws["B5"] = "Metric", "Value"
-        summary_ws["A5"].font = header_font
-        summary_ws["B5"].font = header_font
-
-        metrics = [
-            ("Total inspections", total),
-            ("Escalated inspections", escalated),
-            ("Latest inspection", last_inspection.strftime("%Y-%m-%d %H:%M") if last_inspection else "—"),
-            ("Unique trucks", unique_trucks),
-            ("Unique rangers", unique_rangers),
-            ("Avg. photos per inspection", average_photos),
-        ]
-        for index, (label, value) in enumerate(metrics, start=6):
-            summary_ws.cell(row=index, column=1, value=label)
-            summary_ws.cell(row=index, column=2, value=value)
-
-        type_counts = Counter(inspection.inspection_type for inspection in inspections)
-        summary_ws["A13"], summary_ws["B13"] = "Inspection type", "Count"
-        summary_ws["A13"].font = header_font
-        summary_ws["B13"].font = header_font
-        row_pointer = 14
-        for inspection_type in InspectionType:
-            summary_ws.cell(row=row_pointer, column=1, value=inspection_type.value.title())
-            summary_ws.cell(row=row_pointer, column=2, value=type_counts.get(inspection_type, 0))
-            row_pointer += 1
-
-        ranger_counts = Counter(inspection.ranger_id for inspection in inspections)
-        if ranger_counts:
-            summary_ws["D5"] = "Most active rangers"
-            summary_ws["D5"].font = header_font
-            summary_ws["E5"] = "Completed"
-            summary_ws["E5"].font = header_font
-            for offset, (ranger_id, count) in enumerate(ranger_counts.most_common(3), start=6):
-                ranger = rangers.get(ranger_id)
-                label = ranger.name if ranger else f"Ranger {ranger_id}"
-                summary_ws.cell(row=offset, column=4, value=label)
-                summary_ws.cell(row=offset, column=5, value=count)
-
         for column, width in [(1, 26), (2, 22), (4, 28), (5, 12)]:
             summary_ws.column_dimensions[get_column_letter(column)].width = width
+        for merged in ("A1:E1", "A2:E2", "A3:E3"):
+            summary_ws.merged_cells.add(merged)
 
-        detail_ws = workbook.create_sheet("Inspections")
         detail_headers = [
             "Inspection #",
             "Submitted (UTC)",
@@ -211,83 +221,95 @@ class InspectionService:
             "Notes",
             "Attention items",
         ]
-        detail_ws.append(detail_headers)
-        for cell in detail_ws[1]:
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
+        detail_rows: list[tuple[list[object], bool]] = []
+        column_lengths = [len(header) for header in detail_headers]
 
-        responses_ws = workbook.create_sheet("Responses")
-        responses_ws.append(["Inspection #", "Field", "Value", "Field type"])
-        for cell in responses_ws[1]:
-            cell.font = header_font
+        for column, width in [(1, 16), (2, 36), (3, 40), (4, 14)]:
+            responses_ws.column_dimensions[get_column_letter(column)].width = width
+        responses_ws.append(
+            [_styled_cell(responses_ws, header, font=_HEADER_FONT) for header in ("Inspection #", "Field", "Value", "Field type")]
+        )
 
-        photos_ws = workbook.create_sheet("Photos")
-        photos_ws.append(["Inspection #", "Photo #", "Source", "Preview"])
-        for cell in photos_ws[1]:
-            cell.font = header_font
+        for column, width in [(1, 16), (2, 12), (3, 48), (4, 40)]:
+            photos_ws.column_dimensions[get_column_letter(column)].width = width
+        photos_ws.append(
+            [_styled_cell(photos_ws, header, font=_HEADER_FONT) for header in ("Inspection #", "Photo #", "Source", "Preview")]
+        )
         photo_row = 2
 
-        for inspection in inspections:
-            truck = trucks.get(inspection.truck_id)
-            truck_label = truck.identifier if truck else f"Truck {inspection.truck_id}"
-            ranger = rangers.get(inspection.ranger_id)
-            ranger_label = ranger.name if ranger else f"Ranger {inspection.ranger_id}"
+        append_response = responses_ws.append
+        inspections = self.database.list_inspections()
+        for inspection in _prefetch_related(self.database, inspections, trucks, rangers):
+            inspection_id = inspection.id
+            inspection_type = inspection.inspection_type
+            truck_id = inspection.truck_id
+            ranger_id = inspection.ranger_id
+            created_at = inspection.created_at
+            photo_count = len(inspection.photo_urls)
+            is_escalated = inspection.escalate_visibility
+
+            total += 1
+            truck_ids.add(truck_id)
+            ranger_counts[ranger_id] += 1
+            type_counts[inspection_type] += 1
+            if is_escalated:
+                escalated += 1
+            photo_total += photo_count
+            if last_inspection is None or created_at > last_inspection:
+                last_inspection = created_at
+
+            truck = trucks.get(truck_id)
+            truck_label = truck.identifier if truck else f"Truck {truck_id}"
+            ranger = rangers.get(ranger_id)
+            ranger_label = ranger.name if ranger else f"Ranger {ranger_id}"
             responses = inspection.responses
-            mileage = responses.get("odometer_miles")
-            fuel_level = responses.get("fuel_level")
+            get_response = responses.get
+            mileage = get_response("odometer_miles")
+            fuel_level = get_response("fuel_level")
             attention_items: list[str] = []
-            for field in get_form_definition(inspection.inspection_type):
-                value = responses.get(field.id)
+            append_attention = attention_items.append
+            for field_id, label, type_name, kind in _EXPORT_FIELDS[inspection_type]:
+                value = get_response(field_id)
                 display: str
-                if field.field_type is FieldType.BOOLEAN:
-                    if field.id == "fluid_leak_detected" and value:
-                        attention_items.append(field.label)
-                    elif value is False:
-                        attention_items.append(field.label)
+                if kind == _BOOLEAN or kind == _LEAK_CHECK:
+                    if value is False or (value and kind == _LEAK_CHECK):
+                        append_attention(label)
                     if value is None:
                         display = ""
                     else:
                         display = "Yes" if value else "No"
-                elif field.field_type is FieldType.TEXT and field.id in {"notes", "return_notes"} and value:
-                    attention_items.append(f"{field.label}: {value}")
+                elif kind == _NOTE_TEXT and value:
+                    append_attention(f"{label}: {value}")
                     display = str(value)
                 else:
                     display = "" if value is None else str(value)
-                responses_ws.append(
-                    [
-                        inspection.id,
-                        field.label,
-                        display,
-                        field.field_type.value,
-                    ]
-                )
+                append_response([inspection_id, label, display, type_name])
             attention_text = ", ".join(attention_items)
 
             row = [
-                inspection.id,
-                inspection.created_at.strftime("%Y-%m-%d %H:%M"),
-                inspection.inspection_type.value.title(),
+                inspection_id,
+                created_at.strftime("%Y-%m-%d %H:%M"),
+                inspection_type.value.title(),
                 truck_label,
                 ranger_label,
-                "Yes" if inspection.escalate_visibility else "No",
+                "Yes" if is_escalated else "No",
                 mileage if mileage is not None else "",
                 fuel_level if fuel_level is not None else "",
-                len(inspection.photo_urls),
+                photo_count,
                 "Yes" if inspection.video_url else "No",
-                notes_count.get(inspection.id, 0),
+                notes_count.get(inspection_id, 0),
                 attention_text,
             ]
-            detail_ws.append(row)
-
-            if inspection.escalate_visibility:
-                highlight = PatternFill(start_color="FFF4E5", end_color="FFF4E5", fill_type="solid")
-                for cell in detail_ws[detail_ws.max_row]:
-                    cell.fill = highlight
+            # Buffered until every row is known: column widths are sized from
+            # the content and must be set before the first detail row is written.
+            detail_rows.append((row, is_escalated))
+            for position, value in enumerate(row):
+                length = len(str(value or ""))
+                if length > column_lengths[position]:
+                    column_lengths[position] = length
 
             for index, photo_url in enumerate(inspection.photo_urls, start=1):
-                photos_ws.cell(row=photo_row, column=1, value=inspection.id)
-                photos_ws.cell(row=photo_row, column=2, value=index)
-                photos_ws.cell(row=photo_row, column=3, value=photo_url)
+                preview: Optional[str] = None
                 if photo_resolver:
                     try:
                         resolved = photo_resolver(photo_url)
@@ -303,36 +325,75 @@ class InspectionService:
                                 image.height = int(image.height * scale)
                             anchor = f"D{photo_row}"
                             photos_ws.add_image(image, anchor)
-                            photos_ws.row_dimensions[photo_row].height = max(
-                                photos_ws.row_dimensions[photo_row].height or 0,
-                                image.height * 0.75,
-                            )
+                            photos_ws.row_dimensions[photo_row].height = image.height * 0.75
                         except Exception:
-                            photos_ws.cell(row=photo_row, column=4, value="(Unsupported image)")
+                            preview = "(Unsupported image)"
                     else:
-                        photos_ws.cell(row=photo_row, column=4, value="(Missing file)")
+                        preview = "(Missing file)"
+                photos_ws.append([inspection_id, index, photo_url, preview])
                 photo_row += 1
 
-        detail_ws.auto_filter.ref = detail_ws.dimensions
+        for column_index, max_length in enumerate(column_lengths, start=1):
+            detail_ws.column_dimensions[get_column_letter(column_index)].width = min(max(12, max_length + 2), 42)
+        detail_ws.auto_filter.ref = f"A1:{get_column_letter(len(detail_headers))}{len(detail_rows) + 1}"
         detail_ws.freeze_panes = "A2"
+        detail_ws.append(
+            [
+                _styled_cell(detail_ws, header, font=_HEADER_FONT, alignment=_CENTERED)
+                for header in detail_headers
+            ]
+        )
+        for row, escalated_row in detail_rows:
+            if escalated_row:
+                detail_ws.append([_styled_cell(detail_ws, value, fill=_HIGHLIGHT_FILL) for value in row])
+            else:
+                detail_ws.append(row)
 
-        for column_index in range(1, len(detail_headers) + 1):
-            column_letter = get_column_letter(column_index)
-            max_length = max(
-                (len(str(detail_ws.cell(row=row, column=column_index).value or "")) for row in range(1, detail_ws.max_row + 1)),
-                default=10,
-            )
-            detail_ws.column_dimensions[column_letter].width = min(max(12, max_length + 2), 42)
-
-        responses_ws.column_dimensions[get_column_letter(1)].width = 16
-        responses_ws.column_dimensions[get_column_letter(2)].width = 36
-        responses_ws.column_dimensions[get_column_letter(3)].width = 40
-        responses_ws.column_dimensions[get_column_letter(4)].width = 14
-
-        photos_ws.column_dimensions[get_column_letter(1)].width = 16
-        photos_ws.column_dimensions[get_column_letter(2)].width = 12
-        photos_ws.column_dimensions[get_column_letter(3)].width = 48
-        photos_ws.column_dimensions[get_column_letter(4)].width = 40
+        # The summary needs totals from the full pass, so it is written last; it
+        # was created first and so remains the first tab.
+        average_photos = round(photo_total / total, 1) if total else 0.0
+        metrics = [
+            ("Total inspections", total),
+            ("Escalated inspections", escalated),
+            ("Latest inspection", last_inspection.strftime("%Y-%m-%d %H:%M") if last_inspection else "—"),
+            ("Unique trucks", len(truck_ids)),
+            ("Unique rangers", len(ranger_counts)),
+            ("Avg. photos per inspection", average_photos),
+        ]
+        top_rangers: list[tuple[str, int]] = []
+        for ranger_id, count in ranger_counts.most_common(3):
+            ranger = rangers.get(ranger_id)
+            top_rangers.append((ranger.name if ranger else f"Ranger {ranger_id}", count))
+
+        summary_ws.append([_styled_cell(summary_ws, "Inspection program snapshot", font=_TITLE_FONT)])
+        summary_ws.append([_styled_cell(summary_ws, f"Generated for {generated_by.name}", font=_MUTED_FONT)])
+        summary_ws.append([_styled_cell(summary_ws, now.strftime("Created %Y-%m-%d %H:%M UTC"), font=_MUTED_FONT)])
+        summary_ws.append([])
+        header_row: list[object] = [
+            _styled_cell(summary_ws, "Metric", font=_HEADER_FONT),
+            _styled_cell(summary_ws, "Value", font=_HEADER_FONT),
+        ]
+        if top_rangers:
+            header_row += [
+                None,
+                _styled_cell(summary_ws, "Most active rangers", font=_HEADER_FONT),
+                _styled_cell(summary_ws, "Completed", font=_HEADER_FONT),
+            ]
+        summary_ws.append(header_row)
+        for index, (label, value) in enumerate(metrics):
+            if index < len(top_rangers):
+                summary_ws.append([label, value, None, *top_rangers[index]])
+            else:
+                summary_ws.append([label, value])
+        summary_ws.append([])
+        summary_ws.append(
+            [
+                _styled_cell(summary_ws, "Inspection type", font=_HEADER_FONT),
+                _styled_cell(summary_ws, "Count", font=_HEADER_FONT),
+            ]
+        )
+        for inspection_type in InspectionType:
+            summary_ws.append([inspection_type.value.title(), type_counts[inspection_type]])
 
         timestamp = now.strftime("%Y%m%d-%H%M%S")
         filename = f"inspection-export-{timestamp}.xlsx"
@@ -342,33 +403,27 @@ class InspectionService:
         return filename, buffer.getvalue()
 
     def personnel_metrics(self) -> list[dict[str, object]]:
+        return self._personnel_metrics(self.database.summarize_completed_assignments())
+
+    def _personnel_metrics(self, completed: dict[int, tuple[int, datetime]]) -> list[dict[str, object]]:
         metrics: list[dict[str, object]] = []
         personnel = self.database.list_users_by_roles([UserRole.RANGER, UserRole.SUPERVISOR])
-        assignments = list(self.database.list_assignments())
-        completed_assignments = [assignment for assignment in assignments if assignment.returned_at is not None]
         for person in personnel:
-            user_assignments = [assignment for assignment in completed_assignments if assignment.ranger_id == person.id]
-            if user_assignments:
-                most_recent = max(assignment.returned_at for assignment in user_assignments if assignment.returned_at is not None)
-            else:
-                most_recent = None
+            count, most_recent = completed.get(person.id, (0, None))
             metrics.append(
                 {
                     "user": person,
                     "role": person.role,
-                    "inspections_completed": len(user_assignments),
+                    "inspections_completed": count,
                     "most_recent_inspection": most_recent,
                 }
             )
         return metrics
 
     def dashboard(self) -> dict[str, object]:
-        inspections = list(self.database.list_inspections())
-        assignments = list(self.database.list_assignments())
-        closed_assignments = [assignment for assignment in assignments if assignment.returned_at is not None]
-        escalated = sum(1 for insp in inspections if insp.escalate_visibility)
+        completed = self.database.summarize_completed_assignments()
         return {
-            "total_inspections": len(closed_assignments),
-            "escalated_inspections": escalated,
-            "personnel_metrics": self.personnel_metrics(),
+            "total_inspections": sum(count for count, _ in completed.values()),
+            "escalated_inspections": self.database.count_escalated_inspections(),
+            "personnel_metrics": self._personnel_metrics(completed),
         }
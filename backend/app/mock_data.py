@@ -3,162 +3,134 @@
 from __future__ import annotations
 
 import argparse
+import os
 import random
 import textwrap
-import uuid
 from pathlib import Path
+from typing import Callable, Optional
 
 from .app import TruckInspectionApp
 from .auth import ALLOWED_EMAIL_ROLES
-from .forms import FieldType, get_form_definition
+from .forms import FieldType, InspectionField, get_form_definition
 from .models import InspectionType, UserRole
 
-_SAMPLE_PNG = bytes(
-    [
-        0x89,
-        0x50,
-        0x4E,
-        0x47,
-        0x0D,
-        0x0A,
-        0x1A,
-        0x0A,
-        0x00,
-        0x00,
-        0x00,
-        0x0D,
-        0x49,
-        0x48,
-        0x44,
-        0x52,
-        0x00,
-        0x00,
-        0x00,
-        0x10,
-        0x00,
-        0x00,
-        0x00,
-        0x10,
-        0x08,
-        0x02,
-        0x00,
-        0x00,
-        0x00,
-        0x90,
-        0x91,
-        0x68,
-        0x36,
-        0x00,
-        0x00,
-        0x00,
-        0x0C,
-        0x49,
-        0x44,
-        0x41,
-        0x54,
-        0x78,
-        0x9C,
-        0x63,
-        0xF8,
-        0xCF,
-        0x00,
-        0x00,
-        0x02,
-        0x25,
-        0x01,
-        0x21,
-        0xE2,
-        0x26,
-        0x56,
-        0x00,
-        0x00,
-        0x00,
-        0x00,
-        0x49,
-        0x45,
-        0x4E,
-        0x44,
-        0xAE,
-        0x42,
-        0x60,
-        0x82,
-    ]
+_SAMPLE_PNG = (
+    b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a\x00\x00\x00\x0d\x49\x48\x44\x52\x00"
+    b"\x00\x00\x10\x00\x00\x00\x10\x08\x02\x00\x00\x00\x90\x91\x68\x36\x00"
+    b"\x00\x00\x0c\x49\x44\x41\x54\x78\x9c\x63\xf8\xcf\x00\x00\x02\x25\x01"
+    b"\x21\xe2\x26\x56\x00\x00\x00\x00\x49\x45\x4e\x44\xae\x42\x60\x82"
 )
 
+_UPLOADS_DIR = Path(__file__).resolve().parents[2] / "frontend" / "uploads"
+_PHOTO_TEMPLATE_NAME = ".mock-photo-template.png"
 
-def _ensure_rangers(app: TruckInspectionApp, *, desired: int, rng: random.Random) -> list:
+
+def _ensure_rangers(app: TruckInspectionApp, *, desired: int) -> list:
     rangers = list(app.database.list_rangers())
+    last_index = len(rangers)
     while len(rangers) < desired:
-        index = len(rangers) + 1
-        email = f"mock.ranger{index}@park.example"
-        normalized = email.lower()
-        ALLOWED_EMAIL_ROLES.setdefault(normalized, UserRole.RANGER)
-        if app.database.get_user_by_email(email):
-            index += 1
-            continue
-        responses = [
-            ("Favorite lookout?", f"Ridge {index}"),
-            ("First badge number?", f"{1000 + index}"),
-            ("Preferred snack?", "Trail mix"),
-        ]
-        user = app.auth.register_user(
-            name=f"Mock Ranger {index}",
-            email=email,
-            password="password",
-            security_responses=responses,
-            role=UserRole.RANGER,
-            ranger_number=f"RN-{5000 + index}",
-        )
-        rangers.append(user)
+        # Look up the next batch of candidate emails at once; addresses already
+        # taken (e.g. by a non-ranger account) are skipped and the batch extended.
+        candidates = {
+            f"mock.ranger{index}@park.example": index
+            for index in range(last_index + 1, last_index + 1 + desired - len(rangers))
+        }
+        last_index += len(candidates)
+        existing = app.database.get_users_by_emails(candidates)
+        for email, index in candidates.items():
+            ALLOWED_EMAIL_ROLES.setdefault(email, UserRole.RANGER)
+            if email in existing:
+                continue
+            responses = [
+                ("Favorite lookout?", f"Ridge {index}"),
+                ("First badge number?", f"{1000 + index}"),
+                ("Preferred snack?", "Trail mix"),
+            ]
+            user = app.auth.register_user(
+                name=f"Mock Ranger {index}",
+                email=email,
+                password="password",
+                security_responses=responses,
+                role=UserRole.RANGER,
+                ranger_number=f"RN-{5000 + index}",
+            )
+            rangers.append(user)
     return rangers
 
 
-def _build_responses(inspection_type: InspectionType, *, rng: random.Random, miles: int) -> dict[str, object]:
-    responses: dict[str, object] = {}
-    for field in get_form_definition(inspection_type):
-        if field.field_type is FieldType.BOOLEAN:
-            value = rng.random() > 0.08
-            if field.id == "fluid_leak_detected":
-                value = rng.random() < 0.05
-            responses[field.id] = value
-        elif field.field_type is FieldType.NUMBER:
-            if field.id == "odometer_miles":
-                responses[field.id] = miles
-            else:
-                responses[field.id] = rng.randint(0, 10)
-        elif field.field_type is FieldType.TEXT:
-            if field.id == "fuel_level":
-                responses[field.id] = str(rng.randint(35, 100))
-            elif field.required:
-                responses[field.id] = rng.choice(
-                    [
-                        "All clear",
-                        "Minor dust",
-                        "Ready for patrol",
-                        "Needs wipe-down",
-                    ]
-                )
-            else:
-                snippet = rng.choice(
-                    [
-                        "",
-                        "Updated inventory",
-                        "Added med kit",
-                        "",
-                        "Replaced wiper fluid",
-                    ]
-                )
-                responses[field.id] = snippet
+_STATUS_REMARKS = ("All clear", "Minor dust", "Ready for patrol", "Needs wipe-down")
+_OPTIONAL_REMARKS = ("", "Updated inventory", "Added med kit", "", "Replaced wiper fluid")
+_NOTE_TEXTS = (
+    "Replaced low tire pressure sensor.",
+    "Cab light out, leaving note for maintenance.",
+    "Fuel card stored in visor.",
+)
+_RETURN_NOTES = ("Back at HQ lot.", "Washed exterior.", "Cab cleaned after patrol.", "")
+
+
+def _value_generator(field: InspectionField) -> Optional[Callable[[float], object]]:
+    """Map a uniform draw in [0, 1) to a plausible response; None marks the odometer."""
+    if field.field_type is FieldType.BOOLEAN:
+        if field.id == "fluid_leak_detected":
+            return lambda u: u < 0.05
+        return lambda u: u > 0.08
+    if field.field_type is FieldType.NUMBER:
+        if field.id == "odometer_miles":
+            return None
+        return lambda u: int(u * 11)
+    if field.id == "fuel_level":
+        return lambda u: str(35 + int(u * 66))
+    remarks = _STATUS_REMARKS if field.required else _OPTIONAL_REMARKS
+    return lambda u: remarks[int(u * len(remarks))]
+
+
+_RESPONSE_PLANS: dict[InspectionType, tuple[tuple[str, Optional[Callable[[float], object]]], ...]] = {
+    inspection_type: tuple((field.id, _value_generator(field)) for field in get_form_definition(inspection_type))
+    for inspection_type in InspectionType
+}
+_RESPONSE_TEMPLATES: dict[InspectionType, dict[str, object]] = {
+    inspection_type: dict.fromkeys(field_id for field_id, _ in plan)
+    for inspection_type, plan in _RESPONSE_PLANS.items()
+}
+
+
+def _build_responses(
+    inspection_type: InspectionType, *, draw: Callable[[], float], miles: int
+) -> dict[str, object]:
+    # One uniform draw per field, scaled to the value range; much cheaper than
+    # randint()/choice(), which each go through randrange() in Python.
+    # Copying a pre-sized dict with every key avoids rehashing as fields are added.
+    responses = _RESPONSE_TEMPLATES[inspection_type].copy()
+    for field_id, value_for in _RESPONSE_PLANS[inspection_type]:
+        u = draw()
+        responses[field_id] = miles if value_for is None else value_for(u)
     return responses
 
 
+def _write_sample_png(path: Path) -> None:
+    # A bare descriptor write; the file is far smaller than any buffered writer's buffer.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        os.write(fd, _SAMPLE_PNG)
+    finally:
+        os.close(fd)
+
+
 def _create_mock_photos(upload_dir: Path, *, count: int, prefix: str) -> list[str]:
     upload_dir.mkdir(parents=True, exist_ok=True)
+    # Every mock photo has the same bytes: write them once and hard-link the rest.
+    template = upload_dir / _PHOTO_TEMPLATE_NAME
+    if not template.exists():
+        _write_sample_png(template)
     photo_urls: list[str] = []
     for _ in range(count):
-        filename = f"{prefix}-{uuid.uuid4().hex}.png"
+        filename = f"{prefix}-{os.urandom(16).hex()}.png"
         path = upload_dir / filename
-        path.write_bytes(_SAMPLE_PNG)
+        try:
+            os.link(template, path)
+        except OSError:
+            # Filesystems without hard links.
+            _write_sample_png(path)
         photo_urls.append(f"/uploads/{filename}")
     return photo_urls
 
@@ -170,68 +142,61 @@ def generate_mock_data(
     seed: int = 42,
 ) -> None:
     rng = random.Random(seed)
+    draw = rng.random
     trucks = list(app.list_trucks())
     if not trucks:
         raise RuntimeError("No trucks available; seed defaults before generating mock data")
 
-    rangers = _ensure_rangers(app, desired=6, rng=rng)
-    uploads_dir = Path(__file__).resolve().parents[2] / "frontend" / "uploads"
-
-    for index in range(total_pairs):
-        truck = trucks[index % len(trucks)]
-        ranger = rangers[index % len(rangers)]
-        base_miles = 1200 + index * 12
-        inspection_type = InspectionType.DETAILED if index % 3 == 0 else InspectionType.QUICK
-        responses = _build_responses(inspection_type, rng=rng, miles=base_miles)
-        prefix = f"mock-{truck.identifier.lower()}"
-        photo_count = rng.randint(4, 6)
-        photos = _create_mock_photos(uploads_dir, count=photo_count, prefix=prefix)
-        escalate = rng.random() < 0.12
-
-        checkout_inspection = app.submit_inspection(
-            user=ranger,
-            truck=truck,
-            inspection_type=inspection_type,
-            responses=responses,
-            photo_urls=photos,
-            escalate_visibility=escalate,
-        )
-        assignment = app.checkout_truck(ranger=ranger, truck=truck, inspection=checkout_inspection)
-
-        if rng.random() < 0.4:
-            app.add_note(
-                requester=ranger,
-                inspection=checkout_inspection,
-                content=rng.choice(
-                    [
-                        "Replaced low tire pressure sensor.",
-                        "Cab light out, leaving note for maintenance.",
-                        "Fuel card stored in visor.",
-                    ]
-                ),
+    rangers = _ensure_rangers(app, desired=6)
+
+    # Notes reference nothing created later, so they are queued and inserted in one batch.
+    notes: list[tuple[int, int, str]] = []
+    # One transaction for the whole run instead of a commit per inspection, note and return.
+    with app.database.transaction():
+        for index in range(total_pairs):
+            truck = trucks[index % len(trucks)]
+            ranger = rangers[index % len(rangers)]
+            base_miles = 1200 + index * 12
+            inspection_type = InspectionType.DETAILED if index % 3 == 0 else InspectionType.QUICK
+            responses = _build_responses(inspection_type, draw=draw, miles=base_miles)
+            # Every per-pair choice comes from one fixed batch of uniform draws.
+            photo_u, escalate_u, note_u, note_pick_u, miles_u, return_pick_u = [draw() for _ in range(6)]
+            prefix = f"mock-{truck.identifier.lower()}"
+            photo_count = 4 + int(photo_u * 3)
+            photos = _create_mock_photos(_UPLOADS_DIR, count=photo_count, prefix=prefix)
+            escalate = escalate_u < 0.12
+
+            checkout_inspection = app.submit_inspection(
+                user=ranger,
+                truck=truck,
+                inspection_type=inspection_type,
+                responses=responses,
+                photo_urls=photos,
+                escalate_visibility=escalate,
             )
+            assignment = app.checkout_truck(ranger=ranger, truck=truck, inspection=checkout_inspection)
 
-        end_miles = base_miles + rng.randint(10, 80)
-        return_responses = {
-            "odometer_miles": end_miles,
-            "return_notes": rng.choice(
-                [
-                    "Back at HQ lot.",
-                    "Washed exterior.",
-                    "Cab cleaned after patrol.",
-                    "",
-                ]
-            ),
-        }
+            if note_u < 0.4:
+                notes.append(
+                    (checkout_inspection.id, ranger.id, _NOTE_TEXTS[int(note_pick_u * len(_NOTE_TEXTS))])
+                )
 
-        return_inspection = app.submit_inspection(
-            user=ranger,
-            truck=truck,
-            inspection_type=InspectionType.RETURN,
-            responses=return_responses,
-            photo_urls=[],
-        )
-        app.return_truck(assignment_id=assignment.id, ranger=ranger, inspection=return_inspection)
+            end_miles = base_miles + 10 + int(miles_u * 71)
+            return_responses = {
+                "odometer_miles": end_miles,
+                "return_notes": _RETURN_NOTES[int(return_pick_u * len(_RETURN_NOTES))],
+            }
+
+            return_inspection = app.submit_inspection(
+                user=ranger,
+                truck=truck,
+                inspection_type=InspectionType.RETURN,
+                responses=return_responses,
+                photo_urls=[],
+            )
+            app.return_truck(assignment_id=assignment.id, ranger=ranger, inspection=return_inspection)
+
+        app.database.add_notes(notes)
 
 
 def _summarize(app: TruckInspectionApp) -> str:
@@ -269,12 +234,25 @@ def main() -> None:
         default=42,
         help="Random seed for reproducible data (default: %(default)s)",
     )
+    parser.add_argument(
+        "--fast-seed",
+        action="store_true",
+        help="Build a new database in memory and write it to --database in one step",
+    )
     args = parser.parse_args()
 
     db_path = Path(args.database)
-    app = TruckInspectionApp.create(db_path)
+    if args.fast_seed:
+        if db_path.exists():
+            parser.error("--fast-seed only creates new databases; remove the file or omit the flag")
+        # Generating in memory skips per-commit disk syncs; the backup writes the file once.
+        app = TruckInspectionApp.create(Path(":memory:"))
+    else:
+        app = TruckInspectionApp.create(db_path)
     app.seed_defaults()
     generate_mock_data(app, total_pairs=args.pairs, seed=args.seed)
+    if args.fast_seed:
+        app.database.backup(db_path)
     print(_summarize(app))
 
 
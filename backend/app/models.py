@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from typing import Any, Dict, List, Optional
 
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def reservation_label(ranger_number: Optional[str]) -> str:
+    """Default reservation note built from the last two digits of a ranger number."""
+    digits = _NON_DIGITS.sub("", ranger_number or "")
+    return f"Reserved by Ranger {digits[-2:] or '--'}"
+
 
 class UserRole(str, Enum):
     RANGER = "ranger"
@@ -22,6 +32,10 @@ class User:
     ranger_number: Optional[str] = None
     security_questions: Optional[list[dict[str, str]]] = None
 
+    @cached_property
+    def reserved_by_label(self) -> str:
+        return reservation_label(self.ranger_number)
+
 
 @dataclass
 class Truck:
@@ -61,11 +75,11 @@ class InspectionNote:
 
 @dataclass
 class SessionToken:
-    id: int
     user_id: int
     token: str
     created_at: datetime
     expires_at: datetime
+    expires_at_ns: int
 
 
 @dataclass
@@ -3,19 +3,21 @@ from __future__ import annotations
 import argparse
 import html
 import mimetypes
+import os
+import re
 import secrets
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from email.parser import BytesParser
-from email.policy import default
+from functools import cached_property
 from http import HTTPStatus
-from http.cookies import SimpleCookie
 from pathlib import Path
-from typing import Any, Callable, Iterable, Optional
+from typing import Any, BinaryIO, Callable, Iterable, Optional, Sequence
 from urllib.parse import parse_qs, urlparse
+from wsgiref.util import FileWrapper
 
 from backend.app.app import TruckInspectionApp
-from backend.app.forms import FieldType, get_form_definition
+from backend.app.forms import FieldType, InspectionField, get_form_definition
 from backend.app.models import (
     Inspection,
     InspectionType,
@@ -25,7 +27,7 @@ from backend.app.models import (
     User,
     UserRole,
 )
-from backend.app.auth import ALLOWED_EMAIL_ROLES
+from backend.app.auth import ALLOWED_EMAIL_ROLES, normalize_email
 
 
 TRUCK_CATEGORY_MAP: dict[str, str] = {
@@ -106,9 +108,68 @@ TRUCK_CATEGORY_INFO: dict[str, dict[str, str]] = {
 }
 
 
+_PAGE_FOOTER = """
+            </main>
+            <footer class=\"footer\"><small>&copy; 2024 Park Ranger Tools</small></footer>
+          </body>
+        </html>
+        """
+
+# The gauge tick marks and photo inputs never change, so the markup is built once.
+_FUEL_GAUGE_TICKS = "".join(
+    f'<span class="gauge-tick gauge-tick--{"major" if tick_index % 2 == 0 else "minor"}"'
+    f' style="--tick-rotation:{-90 + (tick_index * 12.5 / 100) * 180:.6f}deg"></span>'
+    for tick_index in range(9)
+)
+
+_PHOTOS_SECTION_HTML = """
+            <div class=\"form-field\">
+              <label for=\"photos-library\">Vehicle photos <span class=\"muted\">(Upload or take 4-10 images)</span></label>
+              <div class=\"photo-inputs\">
+                <input type=\"file\" id=\"photos-library\" name=\"photos\" accept=\"image/*\" multiple required />
+                <p class=\"muted\">Select multiple from your library at once, or use the camera capture below.</p>
+              </div>
+              <div class=\"photo-inputs\" data-photo-field>
+                <label class=\"muted\">Camera capture (take photos one-by-one)</label>
+                <div data-photo-inputs>
+                  <input type=\"file\" name=\"photos\" accept=\"image/*\" capture=\"environment\" />
+                </div>
+                <button type=\"button\" class=\"button secondary\" data-add-photo>Add another capture</button>
+              </div>
+            </div>
+                """
+
+
+# Render-ready profile per category, with the icon markup stripped once rather than per truck card.
+_TRUCK_PROFILES: dict[str, dict[str, str]] = {
+    category: {
+        "category": category,
+        "label": info["label"],
+        "badge_class": info["badge_class"],
+        "icon": info["icon"].strip(),
+    }
+    for category, info in TRUCK_CATEGORY_INFO.items()
+}
+
+
 def backend_role_for_email(email: str) -> UserRole:
-    normalized = email.strip().lower()
-    return ALLOWED_EMAIL_ROLES.get(normalized, UserRole.RANGER)
+    return ALLOWED_EMAIL_ROLES.get(normalize_email(email), UserRole.RANGER)
+
+
+_HEADER_PARAM_RE = re.compile(r';\s*([\w-]+\*?)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+_QUOTED_PAIR_RE = re.compile(r"\\(.)")
+
+
+def _parse_header_value(value: str) -> tuple[str, dict[str, str]]:
+    """Split a header such as Content-Disposition into its lowercased main value and parameters."""
+    main, _, rest = value.partition(";")
+    params: dict[str, str] = {}
+    for match in _HEADER_PARAM_RE.finditer(";" + rest):
+        param = match.group(2).strip()
+        if param.startswith('"') and param.endswith('"') and len(param) >= 2:
+            param = _QUOTED_PAIR_RE.sub(r"\1", param[1:-1])
+        params[match.group(1).lower()] = param
+    return main.strip().lower(), params
 
 
 @dataclass
@@ -124,7 +185,7 @@ class Request:
         method: str,
         target: str,
         headers: dict[str, str],
-        body: bytes = b"",
+        body: bytes | bytearray = b"",
     ) -> None:
         self.method = method
         self.target = target
@@ -133,18 +194,43 @@ class Request:
 
         parsed = urlparse(self.target)
         self.path = parsed.path or "/"
-        self.query = parse_qs(parsed.query)
-        self.form: dict[str, list[str]] = {}
-        self.files: dict[str, list[UploadedFile]] = {}
+        self._query_string = parsed.query
+
+    # Query, body and cookies are parsed on first access; static files and most GETs never need them.
+    @cached_property
+    def query(self) -> dict[str, list[str]]:
+        return parse_qs(self._query_string)
+
+    @cached_property
+    def form(self) -> dict[str, list[str]]:
+        self._parse_body()
+        return self.form
+
+    @cached_property
+    def files(self) -> dict[str, list[UploadedFile]]:
+        self._parse_body()
+        return self.files
+
+    @cached_property
+    def cookies(self) -> dict[str, str]:
+        # Cookies here are opaque session tokens, so a plain split is enough.
+        cookies: dict[str, str] = {}
+        for pair in self.headers.get("Cookie", "").split(";"):
+            key, separator, value = pair.partition("=")
+            if separator:
+                cookies[key.strip()] = value.strip()
+        return cookies
+
+    def _parse_body(self) -> None:
+        # Plain attributes shadow the cached properties, so the body is parsed once for both.
+        self.form = {}
+        self.files = {}
         if self.method in {"POST", "PUT"}:
             content_type = self.headers.get("Content-Type", "")
             if "application/x-www-form-urlencoded" in content_type:
                 self.form = parse_qs(self.body.decode("utf-8"))
             elif "multipart/form-data" in content_type:
                 self._parse_multipart(content_type)
-        cookie_header = self.headers.get("Cookie", "")
-        cookie = SimpleCookie(cookie_header)
-        self.cookies = {key: morsel.value for key, morsel in cookie.items()}
 
     def form_value(self, name: str, default: Optional[str] = None) -> Optional[str]:
         values = self.form.get(name)
@@ -157,28 +243,53 @@ class Request:
         return self.files.get(name, [])
 
     def _parse_multipart(self, content_type: str) -> None:
-        message = BytesParser(policy=default).parsebytes(
-            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + self.body
-        )
-        for part in message.iter_parts():
-            if part.get_content_disposition() != "form-data":
-                continue
-            name = part.get_param("name", header="Content-Disposition")
-            if not name:
-                continue
-            filename = part.get_param("filename", header="Content-Disposition")
-            payload = part.get_payload(decode=True)
-            if filename:
-                upload = UploadedFile(
-                    filename=filename,
-                    content_type=part.get_content_type(),
-                    data=payload,
-                )
-                self.files.setdefault(name, []).append(upload)
-            else:
-                charset = part.get_content_charset("utf-8") or "utf-8"
-                value = payload.decode(charset)
-                self.form.setdefault(name, []).append(value)
+        # Scan for boundaries directly in the body; each part is sliced out once.
+        boundary = _parse_header_value(content_type)[1].get("boundary")
+        if not boundary:
+            return
+        body = self.body
+        delimiter = b"--" + boundary.encode("latin-1")
+        separator = b"\r\n" + delimiter
+        pos = body.find(delimiter)
+        while pos >= 0:
+            pos += len(delimiter)
+            if body.startswith(b"--", pos):
+                break
+            line_end = body.find(b"\r\n", pos)
+            if line_end < 0:
+                break
+            end = body.find(separator, line_end + 2)
+            if end < 0:
+                break
+            self._add_part(body, line_end + 2, end)
+            pos = end + 2
+
+    def _add_part(self, body: bytes | bytearray, start: int, end: int) -> None:
+        header_end = body.find(b"\r\n\r\n", start, end)
+        if header_end < 0:
+            return
+        headers: dict[str, str] = {}
+        for line in body[start:header_end].decode("utf-8", "replace").split("\r\n"):
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        disposition, params = _parse_header_value(headers.get("content-disposition", ""))
+        name = params.get("name")
+        if disposition != "form-data" or not name:
+            return
+        part_type, type_params = _parse_header_value(headers.get("content-type", "text/plain"))
+        # A single copy out of the body whether it arrived as bytes or as the server's bytearray.
+        payload = memoryview(body)[header_end + 4 : end].tobytes()
+        filename = params.get("filename")
+        if filename:
+            upload = UploadedFile(
+                filename=filename,
+                content_type=part_type if "/" in part_type else "text/plain",
+                data=payload,
+            )
+            self.files.setdefault(name, []).append(upload)
+        else:
+            value = payload.decode(type_params.get("charset") or "utf-8")
+            self.form.setdefault(name, []).append(value)
 
     def cookie(self, name: str) -> Optional[str]:
         return self.cookies.get(name)
@@ -188,30 +299,68 @@ class Request:
 class Response:
     status: int = HTTPStatus.OK
     headers: list[tuple[str, str]] = field(default_factory=list)
-    body: bytes | str = ""
+    # Files are left open and streamed by the WSGI server rather than read into memory.
+    body: bytes | str | BinaryIO = ""
+    # Offset in a str body where flash messages are spliced in; None when the page has no slot.
+    flash_at: Optional[int] = None
+    # Lowercased names of the headers set so far, kept in step by set_cookie/add_header.
+    _header_names: set[str] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._header_names.update(name.lower() for name, _ in self.headers)
+
+    def has_header(self, name: str) -> bool:
+        return name.lower() in self._header_names
 
     def set_cookie(self, name: str, value: str, *, path: str = "/", max_age: Optional[int] = None) -> None:
-        cookie = SimpleCookie()
-        cookie[name] = value
-        cookie[name]["path"] = path
+        header_value = f"{name}={value}; Path={path}"
         if max_age is not None:
-            cookie[name]["max-age"] = str(max_age)
-        header_value = cookie.output(header="")
-        self.headers.append(("Set-Cookie", header_value.strip()))
+            header_value += f"; Max-Age={max_age}"
+        self.headers.append(("Set-Cookie", header_value))
+        self._header_names.add("set-cookie")
 
     def add_header(self, name: str, value: str) -> None:
         self.headers.append((name, value))
+        self._header_names.add(name.lower())
+
+
+_FILE_CHUNK_SIZE = 64 * 1024
+_INSPECTION_TYPES_BY_VALUE: dict[str, InspectionType] = {kind.value: kind for kind in InspectionType}
+MAX_SESSIONS = 10_000
+
+# Path-parameter routes; trailing slashes are tolerated as they were with strip("/").
+_DYNAMIC_ROUTE_RE = re.compile(
+    r"/(?:trucks/(?P<truck_id>[^/]*)/(?:inspect/(?P<inspection_type>[^/]+)|(?P<reserve>reserve))"
+    r"|inspections/(?:(?P<inspection_id>[^/]+)|(?P<note_inspection_id>[^/]*)/notes))/*"
+)
 
 
 class TruckInspectionWebApp:
     def __init__(self, database_path: Path) -> None:
         self.service = TruckInspectionApp.create(database_path)
         self.service.seed_defaults()
-        self.sessions: dict[str, int] = {}
-        self.flash_messages: dict[str, list[tuple[str, str]]] = {}
+        # Signed-in users are held per session token so requests need no user query.
+        # Both maps are LRU-bounded; the least recently used session is signed out first.
+        self.sessions: OrderedDict[str, User] = OrderedDict()
+        self.flash_messages: OrderedDict[str, list[tuple[str, str]]] = OrderedDict()
         self.static_dir = Path(__file__).parent / "static"
         self.upload_dir = Path(__file__).parent / "uploads"
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self._simple_routes: dict[tuple[str, str], Callable[[Request], Response]] = {
+            ("GET", "/"): self._home,
+            ("GET", "/login"): self._login_get,
+            ("POST", "/login"): self._login_post,
+            ("GET", "/logout"): self._logout,
+            ("GET", "/register"): self._register_get,
+            ("POST", "/register"): self._register_post,
+            ("GET", "/password"): self._password_get,
+            ("POST", "/password"): self._password_post,
+            ("GET", "/account"): self._account_get,
+            ("POST", "/account"): self._account_post,
+            ("GET", "/inspections"): self._inspection_list,
+            ("GET", "/inspections/export"): self._export_inspections,
+            ("GET", "/dashboard"): self._dashboard,
+        }
 
     # Public API -----------------------------------------------------------------
     def wsgi_app(self, environ: dict[str, Any], start_response: Callable) -> Iterable[bytes]:
@@ -220,7 +369,14 @@ class TruckInspectionWebApp:
         if environ.get("QUERY_STRING") and "?" not in target:
             target = f"{target}?{environ['QUERY_STRING']}"
         length = int(environ.get("CONTENT_LENGTH") or 0)
-        body = environ["wsgi.input"].read(length) if length else b""
+        # Read in bounded chunks straight into one buffer; a short read or early EOF ends the body.
+        body = bytearray()
+        stream = environ["wsgi.input"]
+        while len(body) < length:
+            chunk = stream.read(min(_FILE_CHUNK_SIZE, length - len(body)))
+            if not chunk:
+                break
+            body += chunk
         headers = {key: value for key, value in environ.items() if key.startswith("HTTP_")}
         if "CONTENT_TYPE" in environ:
             headers["Content-Type"] = environ["CONTENT_TYPE"]
@@ -229,8 +385,11 @@ class TruckInspectionWebApp:
         request = Request(method=method, target=target, headers=headers, body=body)
         response = self.handle(request)
         start_response(f"{response.status.value} {response.status.phrase}", response.headers)
-        body = response.body if isinstance(response.body, bytes) else response.body.encode("utf-8")
-        return [body]
+        if isinstance(response.body, str):
+            return [response.body.encode("utf-8")]
+        if isinstance(response.body, bytes):
+            return [response.body]
+        return environ.get("wsgi.file_wrapper", FileWrapper)(response.body, _FILE_CHUNK_SIZE)
 
     def handle(self, request: Request) -> Response:
         if request.method == "GET" and request.path.startswith("/static/"):
@@ -244,15 +403,15 @@ class TruckInspectionWebApp:
         if not route:
             return self._not_found()
         handler, params = route
-        response = handler(request, **params)
-        if not any(name.lower() == "content-type" for name, _ in response.headers):
+        with self.service.request_scope():
+            response = handler(request, **params)
+        if not response.has_header("Content-Type"):
             response.add_header("Content-Type", "text/html; charset=utf-8")
         if not (300 <= response.status.value < 400) and isinstance(response.body, str):
             messages = self._consume_messages(request)
-            if messages:
-                response.body = response.body.replace("<!--FLASH-->", self._render_messages(messages))
-            else:
-                response.body = response.body.replace("<!--FLASH-->", "")
+            if messages and response.flash_at is not None:
+                index = response.flash_at
+                response.body = response.body[:index] + self._render_messages(messages) + response.body[index:]
         return response
 
     def run(self, host: str = "127.0.0.1", port: int = 8000) -> None:
@@ -264,37 +423,21 @@ class TruckInspectionWebApp:
 
     # Routing --------------------------------------------------------------------
     def _match_route(self, request: Request) -> Optional[tuple[Callable, dict[str, Any]]]:
-        simple_routes: dict[tuple[str, str], Callable[[Request], Response]] = {
-            ("GET", "/"): self._home,
-            ("GET", "/login"): self._login_get,
-            ("POST", "/login"): self._login_post,
-            ("GET", "/logout"): self._logout,
-            ("GET", "/register"): self._register_get,
-            ("POST", "/register"): self._register_post,
-            ("GET", "/password"): self._password_get,
-            ("POST", "/password"): self._password_post,
-            ("GET", "/account"): self._account_get,
-            ("POST", "/account"): self._account_post,
-            ("GET", "/inspections"): self._inspection_list,
-            ("GET", "/inspections/export"): self._export_inspections,
-            ("GET", "/dashboard"): self._dashboard,
-        }
-        handler = simple_routes.get((request.method, request.path))
+        handler = self._simple_routes.get((request.method, request.path))
         if handler:
             return handler, {}
 
-        if request.path.startswith("/trucks/"):
-            parts = request.path.strip("/").split("/")
-            if len(parts) == 4 and parts[2] == "inspect":
-                return self._truck_inspection, {"truck_id": parts[1], "inspection_type": parts[3]}
-            if len(parts) == 3 and parts[2] == "reserve" and request.method == "POST":
-                return self._reserve_truck, {"truck_id": parts[1]}
-        if request.path.startswith("/inspections/"):
-            parts = request.path.strip("/").split("/")
-            if len(parts) == 2 and request.method == "GET":
-                return self._inspection_detail, {"inspection_id": parts[1]}
-            if len(parts) == 3 and parts[2] == "notes" and request.method == "POST":
-                return self._add_note, {"inspection_id": parts[1]}
+        match = _DYNAMIC_ROUTE_RE.fullmatch(request.path)
+        if not match:
+            return None
+        if match["inspection_type"] is not None:
+            return self._truck_inspection, {"truck_id": match["truck_id"], "inspection_type": match["inspection_type"]}
+        if match["reserve"] is not None and request.method == "POST":
+            return self._reserve_truck, {"truck_id": match["truck_id"]}
+        if match["inspection_id"] is not None and request.method == "GET":
+            return self._inspection_detail, {"inspection_id": match["inspection_id"]}
+        if match["note_inspection_id"] is not None and request.method == "POST":
+            return self._add_note, {"inspection_id": match["note_inspection_id"]}
         return None
 
     # Session helpers ------------------------------------------------------------
@@ -302,14 +445,16 @@ class TruckInspectionWebApp:
         token = request.cookie("session_id")
         if not token:
             return None
-        user_id = self.sessions.get(token)
-        if not user_id:
-            return None
-        return self.service.database.get_user(user_id)
+        user = self.sessions.get(token)
+        if user is not None:
+            self.sessions.move_to_end(token)
+        return user
 
     def _set_session(self, response: Response, user: User) -> str:
         token = secrets.token_urlsafe(24)
-        self.sessions[token] = user.id
+        self.sessions[token] = user
+        if len(self.sessions) > MAX_SESSIONS:
+            self.sessions.popitem(last=False)
         response.set_cookie("session_id", token, path="/")
         return token
 
@@ -319,9 +464,17 @@ class TruckInspectionWebApp:
             self.sessions.pop(token, None)
             response.set_cookie("session_id", "", path="/", max_age=0)
 
+    def _refresh_sessions(self, user: User) -> None:
+        for token, existing in self.sessions.items():
+            if existing.id == user.id:
+                self.sessions[token] = user
+
     def _flash(self, request: Request, category: str, message: str, *, token: Optional[str] = None) -> None:
         key = token or request.cookie("session_id") or "__anon__"
         self.flash_messages.setdefault(key, []).append((category, message))
+        self.flash_messages.move_to_end(key)
+        if len(self.flash_messages) > MAX_SESSIONS:
+            self.flash_messages.popitem(last=False)
 
     def _consume_messages(self, request: Request) -> list[tuple[str, str]]:
         key = request.cookie("session_id") or "__anon__"
@@ -333,10 +486,9 @@ class TruckInspectionWebApp:
         if not user:
             return self._redirect("/login")
         ranger_filter = user if user.role == UserRole.SUPERVISOR else None
-        inspections = [
-            self._build_inspection_view(insp)
-            for insp in self.service.list_inspections(requester=user, ranger=ranger_filter)
-        ]
+        inspections = self._build_inspection_views(
+            self.service.list_inspections(requester=user, ranger=ranger_filter)
+        )
         if user.role == UserRole.SUPERVISOR:
             trucks = self.service.list_trucks()
             active_assignments = {assignment.truck_id: assignment for assignment in self.service.list_active_assignments()}
@@ -511,7 +663,9 @@ class TruckInspectionWebApp:
                     return self._page("Update password", None, self._render_password(email=email, questions=questions))
                 answers.append(answer)
         try:
-            self.service.auth.update_password(email=email, new_password=password, security_answers=answers)
+            self._refresh_sessions(
+                self.service.auth.update_password(email=email, new_password=password, security_answers=answers)
+            )
         except ValueError as exc:
             self._flash(request, "error", str(exc))
             return self._page("Update password", None, self._render_password(email=email, questions=questions), show_icons=False)
@@ -548,6 +702,7 @@ class TruckInspectionWebApp:
             )
         try:
             updated_user = self.service.auth.update_profile(user.id, name=name, ranger_number=ranger_number)
+            self._refresh_sessions(updated_user)
             if password or confirm:
                 if password != confirm:
                     self._flash(request, "error", "Passwords do not match.")
@@ -587,10 +742,12 @@ class TruckInspectionWebApp:
                             ranger_number=ranger_number,
                         ),
                     )
-                self.service.auth.update_password(
-                    email=updated_user.email,
-                    new_password=password,
-                    security_answers=answers,
+                self._refresh_sessions(
+                    self.service.auth.update_password(
+                        email=updated_user.email,
+                        new_password=password,
+                        security_answers=answers,
+                    )
                 )
         except ValueError as exc:
             self._flash(request, "error", str(exc))
@@ -621,14 +778,14 @@ class TruckInspectionWebApp:
         user = self._current_user(request)
         if not user:
             return self._redirect("/login")
+        # Reject unknown form types before touching the database.
+        inspection_enum = _INSPECTION_TYPES_BY_VALUE.get(inspection_type)
+        if inspection_enum is None:
+            return self._not_found()
         try:
             truck = self.service.get_truck(int(truck_id))
         except (ValueError, LookupError):
             return self._not_found()
-        try:
-            inspection_enum = InspectionType(inspection_type)
-        except ValueError:
-            return self._not_found()
         preserved = self._preserve_form_state(request)
         action = request.query.get("action", [None])[0]
         if request.method == "POST":
@@ -690,7 +847,7 @@ class TruckInspectionWebApp:
 
         if request.method == "POST":
             try:
-                responses = self._collect_responses(request, inspection_enum)
+                responses = self._collect_responses(request, fields)
                 if inspection_enum is InspectionType.RETURN:
                     photos = []
                 else:
@@ -734,7 +891,7 @@ class TruckInspectionWebApp:
         user = self._current_user(request)
         if not user:
             return self._redirect("/login")
-        inspections = [self._build_inspection_view(insp) for insp in self.service.list_inspections(requester=user)]
+        inspections = self._build_inspection_views(self.service.list_inspections(requester=user))
         content = self._render_inspection_table("Inspections", inspections)
         return self._page("Inspections", user, content)
 
@@ -833,7 +990,7 @@ class TruckInspectionWebApp:
         if user.role != UserRole.SUPERVISOR:
             return self._not_found()
         metrics = self.service.dashboard(supervisor=user)
-        inspections = [self._build_inspection_view(insp) for insp in self.service.list_inspections(requester=user)]
+        inspections = self._build_inspection_views(self.service.list_inspections(requester=user))
         content = self._render_dashboard(metrics, inspections)
         return self._page("Supervisor dashboard", user, content)
 
@@ -850,7 +1007,7 @@ class TruckInspectionWebApp:
         nav = self._nav_links(user)
         icons = self._top_nav_icons() if show_icons else ""
         body_attr = f' class="{body_class}"' if body_class else ""
-        body = f"""
+        head = f"""
         <!doctype html>
         <html lang=\"en\">
           <head>
@@ -868,14 +1025,10 @@ class TruckInspectionWebApp:
             </header>
             <div class=\"demo-banner\">Demo environment: data is for testing only.</div>
             <main class=\"content\">
-              <!--FLASH-->
-              {content}
-            </main>
-            <footer class=\"footer\"><small>&copy; 2024 Park Ranger Tools</small></footer>
-          </body>
-        </html>
-        """
-        return Response(body=body)
+              """
+        # A single join copies the page content once.
+        body = "".join((head, "\n              ", content, _PAGE_FOOTER))
+        return Response(body=body, flash_at=len(head))
 
     def _top_nav_icons(self) -> str:
         available = sorted(self.service.list_available_trucks(), key=lambda truck: truck.identifier.upper())
@@ -932,8 +1085,7 @@ class TruckInspectionWebApp:
         if content_type.startswith("text/"):
             body = path.read_text(encoding="utf-8")
             return Response(headers=[("Content-Type", f"{content_type}; charset=utf-8")], body=body)
-        data = path.read_bytes()
-        response = Response(headers=[("Content-Type", content_type)], body=data)
+        response = self._file_response(path, content_type)
         if encoding:
             response.add_header("Content-Encoding", encoding)
         return response
@@ -945,7 +1097,15 @@ class TruckInspectionWebApp:
             return self._not_found()
         content_type, _ = mimetypes.guess_type(str(path))
         content_type = content_type or "application/octet-stream"
-        return Response(headers=[("Content-Type", content_type)], body=path.read_bytes())
+        return self._file_response(path, content_type)
+
+    def _file_response(self, path: Path, content_type: str) -> Response:
+        try:
+            handle = path.open("rb")
+        except OSError:
+            return self._not_found()
+        size = os.fstat(handle.fileno()).st_size
+        return Response(headers=[("Content-Type", content_type), ("Content-Length", str(size))], body=handle)
 
     # Rendering helpers ----------------------------------------------------------
     def _nav_links(self, user: Optional[User]) -> str:
@@ -1149,6 +1309,7 @@ class TruckInspectionWebApp:
             for truck in trucks
             if not (assignment and assignment.truck_id == truck.id)
         ]
+        users = self._card_users(fleet_trucks, active_assignments, reservations)
         fleet_cards = "".join(
             self._render_truck_card(
                 viewer=user,
@@ -1156,6 +1317,7 @@ class TruckInspectionWebApp:
                 assignment=active_assignments.get(truck.id),
                 reservation=reservations.get(truck.id),
                 allow_checkout=can_checkout,
+                users=users,
             )
             for truck in fleet_trucks
         )
@@ -1180,7 +1342,7 @@ class TruckInspectionWebApp:
     def _render_supervisor_home(
         self,
         user: User,
-        trucks: list[Truck],
+        trucks: Sequence[Truck],
         active_assignments: dict[int, TruckAssignment],
         inspections: list[dict[str, Any]],
         assignment: Optional[TruckAssignment],
@@ -1192,6 +1354,7 @@ class TruckInspectionWebApp:
             for truck in trucks
             if not (assignment and assignment.truck_id == truck.id)
         ]
+        users = self._card_users(fleet_trucks, active_assignments, reservations)
         cards = "".join(
             self._render_truck_card(
                 viewer=user,
@@ -1199,6 +1362,7 @@ class TruckInspectionWebApp:
                 assignment=active_assignments.get(truck.id),
                 reservation=reservations.get(truck.id),
                 allow_checkout=reservations.get(truck.id) is None and active_assignments.get(truck.id) is None,
+                users=users,
             )
             for truck in fleet_trucks
         )
@@ -1234,6 +1398,23 @@ class TruckInspectionWebApp:
         </article>
         """
 
+    def _card_users(
+        self,
+        trucks: Sequence[Truck],
+        assignments: dict[int, TruckAssignment],
+        reservations: dict[int, TruckReservation],
+    ) -> dict[int, User]:
+        # One users query for every ranger named on the rendered cards.
+        user_ids: set[int] = set()
+        for truck in trucks:
+            assignment = assignments.get(truck.id)
+            if assignment:
+                user_ids.add(assignment.ranger_id)
+            reservation = reservations.get(truck.id)
+            if reservation:
+                user_ids.add(reservation.user_id)
+        return self.service.database.get_users(user_ids)
+
     def _render_truck_card(
         self,
         viewer: User,
@@ -1242,6 +1423,7 @@ class TruckInspectionWebApp:
         reservation: Optional[TruckReservation],
         *,
         allow_checkout: bool,
+        users: dict[int, User],
     ) -> str:
         profile = self._truck_profile(truck)
         graphic_class = f"truck-card__graphic truck-card__graphic--{profile['badge_class']}"
@@ -1249,7 +1431,7 @@ class TruckInspectionWebApp:
         actions: list[str] = []
         status_messages: list[str] = []
         if assignment:
-            assigned_ranger = self.service.database.get_user(assignment.ranger_id)
+            assigned_ranger = users.get(assignment.ranger_id)
             assigned_label = self._ranger_identifier(assigned_ranger, assignment.ranger_id)
             status_messages.append(
                 f"Checked out by {assigned_label} since {assignment.checked_out_at.strftime('%Y-%m-%d %H:%M')}"
@@ -1278,7 +1460,7 @@ class TruckInspectionWebApp:
         reservation_controls = ""
         can_reserve = allow_checkout and assignment is None
         if reservation:
-            reserved_user = self.service.database.get_user(reservation.user_id)
+            reserved_user = users.get(reservation.user_id)
             base_text = self._reservation_default_for_user(reserved_user)
             if not base_text:
                 base_text = f"Reserved by {self._ranger_identifier(reserved_user, reservation.user_id)}"
@@ -1329,7 +1511,7 @@ class TruckInspectionWebApp:
         </article>
         """
 
-    def _render_truck_legend(self, trucks: list[Truck]) -> str:
+    def _render_truck_legend(self, trucks: Sequence[Truck]) -> str:
         return ""
 
     def _render_inspection_table(
@@ -1435,21 +1617,13 @@ class TruckInspectionWebApp:
                     if fuel_value is None:
                         fuel_value = "50"
                     slider_value = html.escape(str(fuel_value))
-                    ticks: list[str] = []
-                    for tick_index in range(9):
-                        value = tick_index * 12.5
-                        angle = -90 + (value / 100) * 180
-                        tick_class = "gauge-tick gauge-tick--major" if tick_index % 2 == 0 else "gauge-tick gauge-tick--minor"
-                        ticks.append(
-                            f'<span class="{tick_class}" style="--tick-rotation:{angle:.6f}deg"></span>'
-                        )
                     field_html.append(
                         f"""
                         <div class=\"form-field fuel-field\">
                           <label>{label}</label>
                           <div class=\"fuel-gauge\" data-fuel-gauge>
                             <div class=\"gauge-dial\" data-fuel-dial role=\"slider\" tabindex=\"0\" aria-label=\"{label}\" aria-valuemin=\"0\" aria-valuemax=\"100\" aria-valuenow=\"{slider_value}\">
-                              <div class=\"gauge-ticks\">{''.join(ticks)}</div>
+                              <div class=\"gauge-ticks\">{_FUEL_GAUGE_TICKS}</div>
                               <div class=\"gauge-needle\" data-fuel-needle></div>
                               <div class=\"gauge-center\"></div>
                               <div class=\"gauge-labels\"><span>E</span><span>1/2</span><span>F</span></div>
@@ -1497,24 +1671,7 @@ class TruckInspectionWebApp:
         photos_section = ""
         escalate_section = ""
         if action_value != "return":
-            photos_section = (
-                """
-            <div class=\"form-field\">
-              <label for=\"photos-library\">Vehicle photos <span class=\"muted\">(Upload or take 4-10 images)</span></label>
-              <div class=\"photo-inputs\">
-                <input type=\"file\" id=\"photos-library\" name=\"photos\" accept=\"image/*\" multiple required />
-                <p class=\"muted\">Select multiple from your library at once, or use the camera capture below.</p>
-              </div>
-              <div class=\"photo-inputs\" data-photo-field>
-                <label class=\"muted\">Camera capture (take photos one-by-one)</label>
-                <div data-photo-inputs>
-                  <input type=\"file\" name=\"photos\" accept=\"image/*\" capture=\"environment\" />
-                </div>
-                <button type=\"button\" class=\"button secondary\" data-add-photo>Add another capture</button>
-              </div>
-            </div>
-                """
-            )
+            photos_section = _PHOTOS_SECTION_HTML
         else:
             photos_section = ""
 
@@ -1685,9 +1842,9 @@ class TruckInspectionWebApp:
         """
 
     # Data helpers ---------------------------------------------------------------
-    def _collect_responses(self, request: Request, inspection_type: InspectionType) -> dict[str, Any]:
+    def _collect_responses(self, request: Request, fields: Sequence[InspectionField]) -> dict[str, Any]:
         responses: dict[str, Any] = {}
-        for field in get_form_definition(inspection_type):
+        for field in fields:
             raw = request.form_value(field.id)
             if raw is None:
                 if field.required:
@@ -1729,13 +1886,7 @@ class TruckInspectionWebApp:
                 category = "maintenance"
             else:
                 category = "default"
-        info = TRUCK_CATEGORY_INFO.get(category, TRUCK_CATEGORY_INFO["default"])
-        return {
-            "category": category,
-            "label": info["label"],
-            "badge_class": info["badge_class"],
-            "icon": info["icon"].strip(),
-        }
+        return _TRUCK_PROFILES.get(category, _TRUCK_PROFILES["default"])
 
     def _collect_photos(self, request: Request) -> list[str]:
         uploads = request.file_values("photos")
@@ -1755,14 +1906,35 @@ class TruckInspectionWebApp:
             saved.append(f"/uploads/{filename}")
         return saved
 
+    def _build_inspection_views(self, inspections: Iterable[Inspection]) -> list[dict[str, Any]]:
+        # List pages load every referenced truck and ranger with one query each.
+        inspections = list(inspections)
+        truck_ids = {insp.truck_id for insp in inspections}
+        trucks = self.service.database.get_trucks(truck_ids)
+        if len(trucks) != len(truck_ids):
+            raise LookupError("Truck not found")
+        rangers = self.service.database.get_users({insp.ranger_id for insp in inspections})
+        return [
+            {
+                "inspection": insp,
+                "truck": trucks[insp.truck_id],
+                "ranger": rangers.get(insp.ranger_id),
+                "fields": get_form_definition(insp.inspection_type),
+                "notes": [],
+            }
+            for insp in inspections
+        ]
+
     def _build_inspection_view(self, inspection: Inspection, include_notes: bool = False) -> dict[str, Any]:
         truck = self.service.get_truck(inspection.truck_id)
         ranger = self.service.database.get_user(inspection.ranger_id)
         result = {"inspection": inspection, "truck": truck, "ranger": ranger, "fields": get_form_definition(inspection.inspection_type)}
         if include_notes:
+            inspection_notes = self.service.list_notes(inspection.id)
+            authors = self.service.database.get_users({note.author_id for note in inspection_notes})
             notes = []
-            for note in self.service.list_notes(inspection.id):
-                author = self.service.database.get_user(note.author_id)
+            for note in inspection_notes:
+                author = authors.get(note.author_id)
                 if author:
                     notes.append({"note": note, "author": author})
             result["notes"] = notes
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import inspect
 import io
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -98,6 +102,112 @@ def test_authentication_failure(seeded_app: TruckInspectionApp) -> None:
     assert token is None
 
 
+def test_legacy_password_hash_still_verifies(seeded_app: TruckInspectionApp, ranger: User) -> None:
+    legacy_salt = "00112233445566778899aabbccddeeff"
+    legacy_digest = hashlib.sha256(f"{legacy_salt}:password".encode("utf-8")).hexdigest()
+    seeded_app.database.update_user_password(ranger.id, f"{legacy_salt}${legacy_digest}")
+    assert seeded_app.auth.authenticate("ranger@email.com", "password") is not None
+    assert seeded_app.auth.authenticate("ranger@email.com", "wrongpass") is None
+
+
+def test_token_lookup_reflects_profile_update(seeded_app: TruckInspectionApp, ranger: User) -> None:
+    token = seeded_app.auth.authenticate("ranger@email.com", "password")
+    assert token is not None
+    assert seeded_app.auth.get_user_for_token(token.token).name == "Sample Ranger"
+    seeded_app.update_account(ranger.id, name="Renamed Ranger", ranger_number="RN-1001")
+    assert seeded_app.auth.get_user_for_token(token.token).name == "Renamed Ranger"
+    assert seeded_app.auth.get_user_for_token("not-a-token") is None
+
+
+def test_async_token_lookup(seeded_app: TruckInspectionApp, ranger: User, monkeypatch: pytest.MonkeyPatch) -> None:
+    auth = seeded_app.auth
+    token = auth.authenticate("ranger@email.com", "password")
+    assert token is not None
+    assert asyncio.run(seeded_app.database.aget_session_token(token.token)).user_id == ranger.id
+    assert asyncio.run(seeded_app.database.aget_session_token("not-a-token")) is None
+
+    assert auth.get_user_for_token(token.token).id == ranger.id
+    with monkeypatch.context() as patch:
+        # A cache hit must be answered on the loop without a worker thread.
+        patch.setattr(asyncio, "to_thread", None)
+        assert asyncio.run(auth.aget_user_for_token(token.token)).id == ranger.id
+
+    auth._token_cache.clear()
+    assert asyncio.run(auth.aget_user_for_token(token.token)).id == ranger.id
+    assert auth._cached_user_for_token(token.token).id == ranger.id
+    assert asyncio.run(auth.aget_user_for_token("not-a-token")) is None
+
+
+def test_purging_expired_tokens_releases_free_pages(seeded_app: TruckInspectionApp, ranger: User) -> None:
+    database = seeded_app.database
+    expired = datetime.utcnow() - timedelta(days=1)
+    with database.transaction():
+        for index in range(3000):
+            database.add_session_token(ranger.id, f"expired-token-{index}", expired)
+    assert database.purge_expired_tokens() == 3000
+    with database.session() as conn:
+        (free_pages,) = conn.execute("PRAGMA freelist_count").fetchone()
+    assert free_pages == 0
+
+
+def test_failed_commit_rolls_back_pooled_connection(app: TruckInspectionApp) -> None:
+    database = app.database
+    with pytest.raises(sqlite3.IntegrityError):
+        with database.transaction() as conn:
+            # Deferred checks make the dangling note fail at COMMIT rather than at INSERT.
+            conn.execute("PRAGMA defer_foreign_keys = ON")
+            conn.execute(
+                "INSERT INTO inspection_notes (inspection_id, author_id, content, created_at) VALUES (999, 999, 'x', 'x')"
+            )
+    database.add_truck("B2", None)
+    other = sqlite3.connect(database.path)
+    try:
+        assert other.execute("SELECT COUNT(*) FROM trucks WHERE identifier = 'B2'").fetchone() == (1,)
+    finally:
+        other.close()
+
+
+def test_cached_listing_refreshes_after_transaction_commits(app: TruckInspectionApp) -> None:
+    database = app.database
+
+    def list_from_other_thread() -> set[str]:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return {truck.identifier for truck in pool.submit(database.list_active_trucks).result()}
+
+    with database.transaction():
+        database.add_truck("C3", None)
+        # Another thread still sees (and caches) the committed state mid-transaction.
+        assert "C3" not in list_from_other_thread()
+    assert "C3" in list_from_other_thread()
+
+
+def test_legacy_session_table_is_migrated(tmp_path: Path) -> None:
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE session_tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            token TEXT NOT NULL UNIQUE,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    migrated = TruckInspectionApp.create(db_path)
+    migrated.seed_defaults()
+    with migrated.database.session() as session:
+        columns = {row["name"] for row in session.execute("PRAGMA table_info(session_tokens)")}
+    assert "token" not in columns
+    token = migrated.auth.authenticate("ranger@email.com", "password")
+    assert token is not None
+    assert migrated.database.get_session_token(token.token).user_id == token.user_id
+
+
 def test_ranger_submits_quick_inspection(seeded_app: TruckInspectionApp, ranger: User, truck) -> None:
     inspection = seeded_app.submit_inspection(
         user=ranger,
@@ -134,6 +244,21 @@ def test_notes_within_window(seeded_app: TruckInspectionApp, ranger: User, truck
     assert note.content == "Follow-up"
 
 
+def test_bulk_notes_touch_inspection(seeded_app: TruckInspectionApp, ranger: User, truck) -> None:
+    inspection = seeded_app.submit_inspection(
+        user=ranger,
+        truck=truck,
+        inspection_type=InspectionType.QUICK,
+        responses=_quick_responses(),
+        photo_urls=_photos(),
+    )
+    added = seeded_app.database.add_notes([(inspection.id, ranger.id, "First"), (inspection.id, ranger.id, "Second")])
+    assert added == 2
+    assert [note.content for note in seeded_app.list_notes(inspection.id)] == ["First", "Second"]
+    refreshed = seeded_app.database.get_inspection(inspection.id)
+    assert refreshed is not None and refreshed.updated_at >= inspection.updated_at
+
+
 def test_notes_after_window_fails(seeded_app: TruckInspectionApp, ranger: User, truck) -> None:
     inspection = seeded_app.submit_inspection(
         user=ranger,
@@ -349,6 +474,14 @@ def test_seeded_truck_identifiers(seeded_app: TruckInspectionApp) -> None:
     }
 
 
+def test_truck_listing_reflects_new_truck(seeded_app: TruckInspectionApp, supervisor: User) -> None:
+    before = {truck.identifier for truck in seeded_app.list_trucks()}
+    seeded_app.create_truck(identifier="T9", description=None, supervisor=supervisor)
+    after = {truck.identifier for truck in seeded_app.list_trucks()}
+    assert after - before == {"T9"}
+    assert "T9" in {truck.identifier for truck in seeded_app.list_available_trucks()}
+
+
 def test_checkout_and_return_flow(seeded_app: TruckInspectionApp, ranger: User, truck) -> None:
     start_inspection = seeded_app.submit_inspection(
         user=ranger,
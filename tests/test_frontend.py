@@ -4,6 +4,7 @@ import base64
 from http import HTTPStatus
 from http.cookies import SimpleCookie
 import io
+import importlib
 import secrets
 from pathlib import Path
 from urllib.parse import urlencode
@@ -14,6 +15,10 @@ from backend.app.forms import FieldType, get_form_definition
 from backend.app.models import InspectionType
 from frontend.app import Request, create_app
 
+# frontend/__init__.py re-exports the `app` instance, which shadows the submodule for
+# `import frontend.app as ...`, so the module is looked up by name.
+frontend_app = importlib.import_module("frontend.app")
+
 _SAMPLE_PNG = base64.b64decode(
     "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAvoB9pWcVYoAAAAASUVORK5CYII="
 )
@@ -424,3 +429,94 @@ def test_supervisor_can_submit_inspection(app, client: FrontendClient):
     latest = inspections[-1]
     assert latest.truck_id == truck.id
     assert latest.inspection_type is InspectionType.QUICK
+
+
+def test_multipart_parsing_handles_quoted_params_and_binary_payloads():
+    boundary = "formboundary42"
+    body = (
+        f"--{boundary}\r\n"
+        "Content-Disposition: form-data; name=\"notes\"\r\n\r\n"
+        "line one\r\nline two\r\n"
+        f"--{boundary}\r\n"
+        "Content-Disposition: form-data; name=\"photos\"; filename=\"odd;\\\"name\\\".png\"\r\n"
+        "Content-Type: Image/PNG\r\n\r\n"
+    ).encode("utf-8") + _SAMPLE_PNG + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    request = Request(
+        method="POST",
+        target="/",
+        headers={"Content-Type": f'multipart/form-data; boundary="{boundary}"'},
+        body=body,
+    )
+    assert request.form_values("notes") == ["line one\r\nline two"]
+    (upload,) = request.file_values("photos")
+    assert upload.filename == 'odd;"name".png'
+    assert upload.content_type == "image/png"
+    assert upload.data == _SAMPLE_PNG
+
+
+def test_uploads_are_streamed_through_the_wsgi_file_wrapper(app):
+    (app.upload_dir / "streamed-test.png").write_bytes(_SAMPLE_PNG)
+    captured: dict[str, object] = {}
+
+    def start_response(status, headers):
+        captured["status"] = status
+        captured["headers"] = dict(headers)
+
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": "/uploads/streamed-test.png", "wsgi.input": io.BytesIO()}
+    try:
+        result = app.wsgi_app(environ, start_response)
+        try:
+            assert b"".join(result) == _SAMPLE_PNG
+        finally:
+            result.close()
+    finally:
+        (app.upload_dir / "streamed-test.png").unlink()
+    assert captured["status"] == "200 OK"
+    assert captured["headers"]["Content-Length"] == str(len(_SAMPLE_PNG))
+    assert captured["headers"]["Content-Type"] == "image/png"
+
+
+def test_profile_update_is_visible_to_the_current_session(client: FrontendClient):
+    login(client, "ranger@email.com", "password")
+    client.request(
+        "POST",
+        "/account",
+        data={"name": "Alex Renamed", "ranger_number": "RN-2002"},
+        follow_redirects=True,
+    )
+    response = client.request("GET", "/")
+    assert "Welcome, Alex Renamed!" in response.body
+
+
+def test_least_recently_used_session_is_evicted(app, monkeypatch):
+    monkeypatch.setattr(frontend_app, "MAX_SESSIONS", 1)
+    first, second = FrontendClient(app), FrontendClient(app)
+    login(first, "ranger@email.com", "password")
+    login(second, "ranger@email.com", "password")
+    assert len(app.sessions) == 1
+    assert first.request("GET", "/").status == HTTPStatus.SEE_OTHER
+    assert second.request("GET", "/").status == HTTPStatus.OK
+
+
+def test_wsgi_request_body_is_read_in_full(app):
+    class TrickleInput(io.BytesIO):
+        def read(self, size=-1):
+            return super().read(min(size, 7))
+
+    body = urlencode({"email": "ranger@email.com", "password": "password"}).encode("utf-8")
+    captured: dict[str, object] = {}
+
+    def start_response(status, headers):
+        captured["status"] = status
+        captured["headers"] = headers
+
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": "/login",
+        "CONTENT_TYPE": "application/x-www-form-urlencoded",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": TrickleInput(body),
+    }
+    app.wsgi_app(environ, start_response)
+    assert captured["status"] == "303 See Other"
+    assert any(name == "Set-Cookie" for name, _ in captured["headers"])